@@ -0,0 +1,90 @@
+"""
+Prueba de carga simple (solo stdlib) para comparar el servidor de desarrollo
+con gunicorn sobre los mismos endpoints.
+
+    python bench_load.py --url https://localhost:8002 --insecure -u admin -p secreto
+    python bench_load.py --url http://127.0.0.1:8002 -u admin -p secreto -c 32 -n 500
+
+Escenarios: POST /auth/login y GET /plan-maestro (con token). Reporta
+requests/s, latencias p50/p95/p99 y errores por escenario.
+"""
+import argparse
+import json
+import ssl
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[idx]
+
+
+def make_request(url, method="GET", body=None, token=None, ctx=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, context=ctx, timeout=30) as resp:
+            payload = resp.read()
+            return time.perf_counter() - start, resp.status, payload
+    except urllib.error.HTTPError as e:
+        return time.perf_counter() - start, e.code, e.read()
+    except Exception:
+        return time.perf_counter() - start, 0, b""
+
+
+def run_scenario(name, fn, total, concurrency):
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for elapsed, status, _ in ex.map(lambda _: fn(), range(total)):
+            latencies.append(elapsed * 1000)
+            if status != 200:
+                errors += 1
+    wall = time.perf_counter() - start
+    print(f"{name:<16} n={total:<6} c={concurrency:<4} "
+          f"rps={total / wall:8.1f}  p50={percentile(latencies, 50):7.1f}ms  "
+          f"p95={percentile(latencies, 95):7.1f}ms  p99={percentile(latencies, 99):7.1f}ms  "
+          f"errores={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del backend GWP")
+    parser.add_argument("--url", default="https://localhost:8002")
+    parser.add_argument("-u", "--username", required=True)
+    parser.add_argument("-p", "--password", required=True)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("--insecure", action="store_true", help="no validar el certificado TLS")
+    args = parser.parse_args()
+
+    ctx = None
+    if args.url.startswith("https") and args.insecure:
+        ctx = ssl._create_unverified_context()
+    base = args.url.rstrip("/")
+    creds = {"username": args.username, "password": args.password}
+
+    _, status, payload = make_request(f"{base}/auth/login", "POST", creds, ctx=ctx)
+    if status != 200:
+        raise SystemExit(f"Login falló ({status}): {payload[:200]!r}")
+    token = json.loads(payload)["token"]
+
+    run_scenario("/auth/login",
+                 lambda: make_request(f"{base}/auth/login", "POST", creds, ctx=ctx),
+                 args.requests, args.concurrency)
+    run_scenario("/plan-maestro",
+                 lambda: make_request(f"{base}/plan-maestro", token=token, ctx=ctx),
+                 args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
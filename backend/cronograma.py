@@ -0,0 +1,292 @@
+"""
+Cronograma del plan maestro por el método de la ruta crítica (CPM).
+
+Módulo sin efectos secundarios al importarse. El grafo sale de activity_code /
+dependency_code (una actividad puede depender de varios códigos separados por
+coma, punto y coma o espacios) y las duraciones de week_start / week_end.
+
+Internamente las semanas se manejan como offsets desde 0 con fin exclusivo: una
+actividad en las semanas 3..5 empieza en 2 y termina en 5 (duración 3). Hacia
+afuera se vuelve a semanas inclusivas, igual que en plan_maestro.
+
+StatusIndex deriva al leer el estado por fecha (vencida, por vencer, bloqueada
+por una dependencia vencida, directa o transitiva) sin escribir en la tabla.
+"""
+import bisect
+import datetime
+import re
+
+_CODE_SPLIT_RE = re.compile(r"[,;\s]+")
+
+
+def parse_dependencies(dependency_code):
+    """Códigos de los que depende una actividad, sin vacíos ni repetidos."""
+    codes = []
+    for code in _CODE_SPLIT_RE.split(dependency_code or ""):
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+
+def task_from_row(row):
+    """(id, activity_code, dependency_code, week_start, week_end) -> tarea.
+    Sin semanas la actividad dura 0 y no tiene inicio planificado."""
+    task_id, code, dependency_code, week_start, week_end = row
+    start = week_start - 1 if week_start is not None else None
+    if week_start is not None and week_end is not None:
+        duration = max(week_end - week_start + 1, 0)
+    else:
+        duration = 0
+    return task_id, {
+        "code": (code or "").strip() or None,
+        "deps": tuple(parse_dependencies(dependency_code)),
+        "start": start,
+        "duration": duration,
+    }
+
+
+class Schedule:
+    """Grafo de dependencias + pasadas CPM. `rebuild` calcula todo; `update`
+    recalcula solo lo afectado si no cambió la estructura del grafo."""
+
+    def __init__(self):
+        self.tasks = {}
+        self.preds = {}
+        self.succs = {}
+        self.order = []          # orden topológico (sin las bloqueadas)
+        self.pos = {}
+        self.blocked = set()     # en un ciclo o dependientes de uno
+        self.missing = {}        # id -> códigos de dependencia inexistentes
+        self.es, self.ef, self.ls, self.lf = {}, {}, {}, {}
+        self.finish = 0
+
+    def rebuild(self, rows):
+        self.tasks = dict(task_from_row(r) for r in rows)
+        self._build_graph()
+        self._forward(self.order)
+        self._backward(self.order)
+
+    def update(self, rows, deleted_ids=()):
+        """Aplica filas nuevas/modificadas y borradas. Si cambian códigos o
+        dependencias se reconstruye el grafo; si solo cambian semanas, se
+        recalculan ES/EF aguas abajo y LS/LF aguas arriba de lo modificado.
+        Devuelve "full" o "incremental"."""
+        structural = False
+        changed = set()
+        for task_id in deleted_ids:
+            if self.tasks.pop(task_id, None) is not None:
+                structural = True
+        for row in rows:
+            task_id, task = task_from_row(row)
+            old = self.tasks.get(task_id)
+            self.tasks[task_id] = task
+            if old is None or old["code"] != task["code"] or old["deps"] != task["deps"]:
+                structural = True
+            elif old["start"] != task["start"] or old["duration"] != task["duration"]:
+                changed.add(task_id)
+
+        if structural:
+            self._build_graph()
+            self._forward(self.order)
+            self._backward(self.order)
+            return "full"
+
+        changed -= self.blocked
+        if not changed:
+            return "incremental"
+        previous_finish = self.finish
+        self._forward(self._closure(changed, self.succs))
+        if self.finish != previous_finish:
+            # Cambió el fin del proyecto: todas las holguras se mueven
+            self._backward(self.order)
+        else:
+            self._backward(self._closure(changed, self.preds))
+        return "incremental"
+
+    def _build_graph(self):
+        by_code = {}
+        for task_id, task in self.tasks.items():
+            if task["code"]:
+                by_code.setdefault(task["code"], []).append(task_id)
+
+        self.preds = {t: set() for t in self.tasks}
+        self.succs = {t: set() for t in self.tasks}
+        self.missing = {}
+        for task_id, task in self.tasks.items():
+            for code in task["deps"]:
+                if code not in by_code:
+                    self.missing.setdefault(task_id, []).append(code)
+                    continue
+                for pred in by_code[code]:
+                    if pred != task_id:
+                        self.preds[task_id].add(pred)
+                        self.succs[pred].add(task_id)
+
+        # Kahn: lo que no sale ordenado está en un ciclo o depende de uno
+        indegree = {t: len(p) for t, p in self.preds.items()}
+        ready = sorted(t for t, n in indegree.items() if n == 0)
+        order = []
+        while ready:
+            task_id = ready.pop()
+            order.append(task_id)
+            for succ in self.succs[task_id]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    ready.append(succ)
+        self.order = order
+        self.pos = {t: i for i, t in enumerate(order)}
+        self.blocked = set(self.tasks) - set(order)
+        self.es, self.ef, self.ls, self.lf = {}, {}, {}, {}
+
+    def _closure(self, start, edges):
+        """Nodos alcanzables desde `start` siguiendo `edges`, en orden topológico."""
+        seen = set(start)
+        stack = list(start)
+        while stack:
+            for nxt in edges[stack.pop()]:
+                if nxt not in seen and nxt not in self.blocked:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return sorted(seen, key=self.pos.__getitem__)
+
+    def _forward(self, nodes):
+        for task_id in nodes:
+            task = self.tasks[task_id]
+            es = task["start"] or 0
+            for pred in self.preds[task_id]:
+                es = max(es, self.ef[pred])
+            self.es[task_id] = es
+            self.ef[task_id] = es + task["duration"]
+        self.finish = max((self.ef[t] for t in self.order), default=0)
+
+    def _backward(self, nodes):
+        for task_id in reversed(nodes):
+            lf = self.finish
+            for succ in self.succs[task_id]:
+                if succ not in self.blocked:
+                    lf = min(lf, self.ls[succ])
+            self.lf[task_id] = lf
+            self.ls[task_id] = lf - self.tasks[task_id]["duration"]
+
+    def result(self):
+        items = []
+        critical = []
+        for task_id in sorted(self.tasks):
+            task = self.tasks[task_id]
+            item = {
+                "id": task_id,
+                "activity_code": task["code"],
+                "dependencies": sorted(self.preds.get(task_id, ())),
+                "missing_dependencies": self.missing.get(task_id, []),
+                "duration_weeks": task["duration"],
+                "blocked": task_id in self.blocked,
+            }
+            if task_id in self.blocked:
+                item.update(earliest_start=None, earliest_finish=None, latest_start=None,
+                            latest_finish=None, slack=None, critical=False, conflict=False)
+            else:
+                es, ls = self.es[task_id], self.ls[task_id]
+                item.update(
+                    earliest_start=es + 1, earliest_finish=self.ef[task_id],
+                    latest_start=ls + 1, latest_finish=self.lf[task_id],
+                    slack=ls - es, critical=ls == es,
+                    # Planificada antes de que terminen sus dependencias
+                    conflict=task["start"] is not None and task["start"] < es,
+                )
+                if ls == es:
+                    critical.append(task_id)
+            items.append(item)
+        critical.sort(key=lambda t: (self.es[t], self.pos[t]))
+        return {
+            "project_finish_week": self.finish,
+            "critical_path": critical,
+            "blocked": sorted(self.blocked),
+            "items": items,
+        }
+
+
+class StatusIndex:
+    """Actividades abiertas (no completadas) ordenadas por fecha_fin. Vencidas y
+    por vencer salen con bisect sobre la lista, sin recorrer el plan completo.
+
+    done_statuses: estados que cierran una actividad (se comparan sin
+    mayúsculas); los define quien llama para que coincidan con su SQL."""
+
+    def __init__(self, done_statuses):
+        self.done_statuses = frozenset(s.upper() for s in done_statuses)
+        self.rows = {}     # id -> (status, fecha_fin)
+        self._keys = []    # [(fecha_fin, id)] de las abiertas con fecha, ordenado
+
+    def is_done(self, status):
+        return (status or "").strip().upper() in self.done_statuses
+
+    def rebuild(self, rows):
+        """rows: (id, status, fecha_fin)."""
+        self.rows = {r[0]: (r[1], r[2]) for r in rows}
+        self._keys = sorted(
+            (fin, task_id) for task_id, (status, fin) in self.rows.items()
+            if fin is not None and not self.is_done(status)
+        )
+
+    def update(self, rows, deleted_ids=()):
+        for task_id in deleted_ids:
+            self._remove(task_id)
+            self.rows.pop(task_id, None)
+        for task_id, status, fin in rows:
+            self._remove(task_id)
+            self.rows[task_id] = (status, fin)
+            if fin is not None and not self.is_done(status):
+                bisect.insort(self._keys, (fin, task_id))
+
+    def _remove(self, task_id):
+        old = self.rows.get(task_id)
+        if old is None or old[1] is None:
+            return
+        i = bisect.bisect_left(self._keys, (old[1], task_id))
+        if i < len(self._keys) and self._keys[i] == (old[1], task_id):
+            del self._keys[i]
+
+    def overdue(self, today):
+        """Abiertas con fecha_fin < today."""
+        return self._keys[:bisect.bisect_left(self._keys, (today,))]
+
+    def due_soon(self, today, days):
+        """Abiertas con fecha_fin en [today, today + days]."""
+        lo = bisect.bisect_left(self._keys, (today,))
+        hi = bisect.bisect_left(self._keys, (today + datetime.timedelta(days=days + 1),))
+        return self._keys[lo:hi]
+
+    def derive(self, schedule, today, due_soon_days):
+        """Estado derivado de las actividades que tienen uno, por id. Prioridad:
+        Vencida > Bloqueada > Por vencer. Bloqueada alcanza a todos los sucesores
+        abiertos de una vencida, directos o transitivos (el recorrido se corta en
+        las completadas); bloqueada_por lista las vencidas que la bloquean."""
+        result = {}
+        for fin, task_id in self.due_soon(today, due_soon_days):
+            result[task_id] = {"estado_derivado": "Por vencer", "dias_restantes": (fin - today).days}
+
+        overdue = self.overdue(today)
+        for fin, task_id in overdue:
+            seen = {task_id}
+            stack = list(schedule.succs.get(task_id, ()))
+            while stack:
+                succ = stack.pop()
+                if succ in seen:
+                    continue
+                seen.add(succ)
+                status, succ_fin = self.rows.get(succ, (None, None))
+                if self.is_done(status):
+                    continue
+                entry = result.get(succ)
+                if entry is None or entry["estado_derivado"] != "Bloqueada":
+                    result[succ] = entry = {
+                        "estado_derivado": "Bloqueada",
+                        "dias_restantes": (succ_fin - today).days if succ_fin else None,
+                        "bloqueada_por": [],
+                    }
+                entry["bloqueada_por"].append(task_id)
+                stack.extend(schedule.succs.get(succ, ()))
+
+        for fin, task_id in overdue:
+            result[task_id] = {"estado_derivado": "Vencida", "dias_restantes": (fin - today).days}
+        return result
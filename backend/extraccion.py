@@ -0,0 +1,127 @@
+"""
+Extracción de texto de archivos (PDF, DOCX, texto plano).
+
+Módulo sin efectos secundarios al importarse: se ejecuta dentro de los
+procesos del pool de extracción (contexto "spawn"), que lo importan por nombre.
+"""
+import hashlib
+import os
+import re
+import signal
+import zipfile
+
+TEXT_EXTENSIONS = ['.txt', '.md', '.json', '.csv', '.py', '.js', '.html', '.css', '.xml']
+
+# Extensiones cuyo parseo es costoso en CPU y conviene enviar al pool de procesos
+HEAVY_EXTENSIONS = ['.pdf', '.docx']
+
+
+# Texto devuelto cuando se agota el tiempo (no cacheable; el worker de ingesta reintenta)
+TIMEOUT_TEXT = "[Tiempo de extracción agotado]"
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise ExtractionTimeout()
+
+
+def extract_file_text(full_path):
+    """Extrae texto de un archivo. Devuelve (texto, cacheable): los avisos
+    (librería faltante, formato no soportado, error) no se persisten."""
+    ext = os.path.splitext(full_path)[1].lower()
+    try:
+        # Texto Plano
+        if ext in TEXT_EXTENSIONS:
+            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read(), True
+
+        # DOCX (Word)
+        elif ext == '.docx':
+            try:
+                import docx
+            except ImportError:
+                return "[Instale 'python-docx' para leer archivos Word .docx]", False
+            doc = docx.Document(full_path)
+            text = []
+            # Párrafos
+            for para in doc.paragraphs:
+                if para.text.strip():
+                    text.append(para.text)
+            # Tablas (básico)
+            for table in doc.tables:
+                for row in table.rows:
+                    row_text = [cell.text for cell in row.cells]
+                    text.append(" | ".join(row_text))
+            return "\n".join(text), True
+
+        # Intentar leer PDF si hay librería
+        elif ext == '.pdf':
+            try:
+                import pypdf as pdf_lib
+            except ImportError:
+                try:
+                    import PyPDF2 as pdf_lib
+                except ImportError:
+                    return "[Instale pypdf para extraer texto de PDFs]", False
+            with open(full_path, 'rb') as f:
+                reader = pdf_lib.PdfReader(f)
+                text = []
+                for page in reader.pages[:40]: # Limitar pgs
+                    text.append(page.extract_text() or "")
+            return "\n".join(text), True
+
+        return f"[Formato {ext} no soportado para lectura]", False
+    except ExtractionTimeout:
+        raise
+    except Exception as e:
+        return f"[Error leyendo: {str(e)}]", False
+
+
+def file_sha256(full_path, block_size=1024 * 1024):
+    """SHA-256 del archivo, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(full_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_pages(full_path):
+    """Número de páginas (PDF, o DOCX según docProps/app.xml); None si no aplica."""
+    ext = os.path.splitext(full_path)[1].lower()
+    try:
+        if ext == '.pdf':
+            try:
+                import pypdf as pdf_lib
+            except ImportError:
+                import PyPDF2 as pdf_lib
+            with open(full_path, 'rb') as f:
+                return len(pdf_lib.PdfReader(f).pages)
+        if ext == '.docx':
+            # Word guarda el conteo de su última paginación; no requiere python-docx
+            with zipfile.ZipFile(full_path) as z:
+                match = re.search(rb"<Pages>(\d+)</Pages>", z.read("docProps/app.xml"))
+            return int(match.group(1)) if match else None
+    except Exception:
+        return None
+    return None
+
+
+def extract_with_timeout(full_path, timeout):
+    """Igual que extract_file_text, pero aborta si tarda más de `timeout` segundos.
+    Pensado para correr en el hilo principal de un proceso del pool (usa SIGALRM),
+    de modo que un PDF patológico libera el worker en vez de bloquearlo."""
+    if not timeout or not hasattr(signal, "SIGALRM"):
+        return extract_file_text(full_path)
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_file_text(full_path)
+    except ExtractionTimeout:
+        return TIMEOUT_TEXT, False
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,58 @@
+"""
+Configuración de gunicorn para el backend GWP.
+
+Dimensionamiento:
+  - Cada worker es un proceso con su propio pool de conexiones (DB_POOL_MAX),
+    creado con el primer request que usa la base.
+  - `threads` (GUNICORN_THREADS, 32) no sale de DB_POOL_MAX: no todos los
+    hilos usan la base a la vez (SSE, descargas, 304 del cache), y los que sí
+    esperan hasta POOL_TIMEOUT por una conexión.
+  - Conexiones a Postgres = workers * (DB_POOL_MAX + 1 del feed de cambios);
+    debe quedar bajo max_connections del servidor.
+  - Cada cliente SSE (/eventos) ocupa un hilo mientras está conectado. Por
+    worker se aceptan a lo sumo SSE_MAX_CONNECTIONS (16); los siguientes reciben
+    503 y reintentan. `threads` debe superar ese tope en al menos DB_POOL_MAX
+    para que la API no se quede sin hilos.
+  - El pool de extracción (EXTRACT_WORKERS) es por worker: con varios workers
+    conviene bajarlo (p. ej. EXTRACT_WORKERS=2).
+
+Recarga sin cortar requests en curso:  kill -HUP <pid del master>
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.getenv("GWP_BIND", "127.0.0.1:8002")
+
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+
+# Cada worker corre create_app() (migraciones, carpetas) y crea su pool y su
+# listener del feed de cambios después del fork; no precargar en el master
+preload_app = False
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))   # detalle-completo puede extraer PDFs
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar workers de a poco acota fugas de memoria (caches, parsers)
+max_requests = 2000
+max_requests_jitter = 200
+
+# Detrás de un proxy que termina TLS
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+accesslog = "-"
+errorlog = "-"
+
+# Métricas (/metrics) sumadas entre workers: cada uno vuelca las suyas en este
+# directorio (ver metricas.SharedDirectory). Se vacía al arrancar el master; un
+# HUP no lo vacía, así los counters no vuelven a cero al recargar.
+os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "gwp-metrics"))
+
+
+def on_starting(server):
+    for path in glob.glob(os.path.join(os.environ["METRICS_DIR"], "*.json")):
+        os.remove(path)
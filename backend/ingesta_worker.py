@@ -0,0 +1,202 @@
+"""
+Worker de ingesta del repositorio.
+
+Procesa la cola trabajos_ingesta: extrae el texto del archivo, calcula hash
+SHA-256, páginas y tamaño, reconstruye search_vector y fragmentos BM25, y deja
+el documento en estado_procesamiento = 'Indexado'. Si el archivo no cambió
+desde la última ingesta (misma firma ruta:mtime:tamaño, p. ej. al re-encolar
+por una edición de metadatos) no se vuelve a hashear ni a contar páginas.
+
+    cd backend
+    python ingesta_worker.py            # proceso permanente (despierta por NOTIFY)
+    python ingesta_worker.py --once     # vacía la cola y termina
+
+Se pueden correr varios procesos en paralelo: cada trabajo se toma con
+FOR UPDATE SKIP LOCKED y queda "arrendado" por LEASE_SECONDS; si el worker muere,
+otro lo retoma al vencer el lease.
+"""
+import argparse
+import os
+import select
+import signal
+import time
+import traceback
+
+import psycopg2
+
+from app1 import (
+    DB_CONNECTION_STRING, EXTRACT_FILE_TIMEOUT, INGESTA_CHANNEL,
+    get_db_connection, release_db_connection,
+    file_signature, lookup_cached_texts, save_file_text, reindex_repositorio,
+)
+from extraccion import extract_with_timeout, file_sha256, count_pages, TIMEOUT_TEXT
+
+MAX_INTENTOS = int(os.getenv("INGESTA_MAX_INTENTOS", 5))
+LEASE_SECONDS = int(os.getenv("INGESTA_LEASE_SECONDS", max(600, EXTRACT_FILE_TIMEOUT * 4)))
+POLL_SECONDS = float(os.getenv("INGESTA_POLL_SECONDS", 30))  # también recupera leases vencidos
+BACKOFF_SECONDS = 30  # 30s, 60s, 120s, ...
+
+_stopping = False
+
+
+def _request_stop(signum, frame):
+    global _stopping
+    _stopping = True
+
+
+def claim_job(conn):
+    """Toma el siguiente trabajo disponible (o con lease vencido) y lo arrienda."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE trabajos_ingesta
+            SET estado = 'procesando', intentos = intentos + 1,
+                lease_hasta = NOW() + make_interval(secs => %s), updated_at = NOW()
+            WHERE id = (
+                SELECT id FROM trabajos_ingesta
+                WHERE (estado = 'pendiente' AND disponible_at <= NOW())
+                   OR (estado = 'procesando' AND lease_hasta < NOW())
+                ORDER BY disponible_at, id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, documento_id, intentos
+        """, (LEASE_SECONDS,))
+        job = cur.fetchone()
+    conn.commit()
+    return job
+
+
+def process_job(conn, job_id, doc_id):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT ruta_archivo, firma_ingesta, hash_sha256, paginas
+            FROM repositorio_documentos WHERE id = %s
+        """, (doc_id,))
+        row = cur.fetchone()
+    conn.commit()
+    if row is None:
+        return  # documento borrado; el trabajo cae en cascada
+
+    ruta, firma_anterior = row[0], row[1]
+    extracted, sha, paginas, tamano, firma = None, None, None, None, None
+    if ruta:
+        key, full_path = file_signature(ruta)
+        if key is None:
+            raise FileNotFoundError(f"Archivo físico no encontrado: {ruta}")
+        _, pending = lookup_cached_texts(conn, [ruta])
+        conn.commit()
+        if ruta in pending:
+            text, cacheable = extract_with_timeout(full_path, EXTRACT_FILE_TIMEOUT)
+            if text == TIMEOUT_TEXT:
+                raise TimeoutError(TIMEOUT_TEXT)
+            if cacheable:
+                extracted = (key, text)
+        firma = "{}:{}:{}".format(*key)
+        if firma == firma_anterior and row[2] is not None:
+            sha, paginas = row[2], row[3]
+        else:
+            sha = file_sha256(full_path)
+            paginas = count_pages(full_path)
+        tamano = key[2]
+
+    with conn.cursor() as cur:
+        if extracted:
+            save_file_text(cur, *extracted)
+        cur.execute("""
+            UPDATE repositorio_documentos
+            SET hash_sha256 = %s, paginas = %s, tamano_bytes = %s, firma_ingesta = %s,
+                estado_procesamiento = 'Indexado'
+            WHERE id = %s
+        """, (sha, paginas, tamano, firma, doc_id))
+        reindex_repositorio(cur, ids=[doc_id])
+        cur.execute("DELETE FROM trabajos_ingesta WHERE id = %s", (job_id,))
+    conn.commit()
+
+
+def fail_job(conn, job_id, doc_id, intentos, error):
+    conn.rollback()
+    with conn.cursor() as cur:
+        if intentos >= MAX_INTENTOS:
+            cur.execute("""
+                UPDATE trabajos_ingesta
+                SET estado = 'error', lease_hasta = NULL, ultimo_error = %s, updated_at = NOW()
+                WHERE id = %s
+            """, (error, job_id))
+            cur.execute("UPDATE repositorio_documentos SET estado_procesamiento = 'Error' WHERE id = %s", (doc_id,))
+        else:
+            cur.execute("""
+                UPDATE trabajos_ingesta
+                SET estado = 'pendiente', lease_hasta = NULL, ultimo_error = %s, updated_at = NOW(),
+                    disponible_at = NOW() + make_interval(secs => %s)
+                WHERE id = %s
+            """, (error, BACKOFF_SECONDS * 2 ** (intentos - 1), job_id))
+    conn.commit()
+
+
+def drain_queue():
+    """Procesa trabajos hasta que no quede ninguno disponible. Devuelve cuántos."""
+    processed = 0
+    while not _stopping:
+        conn = get_db_connection()
+        try:
+            job = claim_job(conn)
+            if job is None:
+                return processed
+            job_id, doc_id, intentos = job
+            try:
+                process_job(conn, job_id, doc_id)
+                print(f"Ingesta: documento {doc_id} indexado")
+            except Exception as e:
+                traceback.print_exc()
+                fail_job(conn, job_id, doc_id, intentos, str(e))
+            processed += 1
+        finally:
+            release_db_connection(conn)
+    return processed
+
+
+def listen_connection():
+    conn = psycopg2.connect(DB_CONNECTION_STRING)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {INGESTA_CHANNEL};")
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de ingesta del repositorio GWP")
+    parser.add_argument("--once", action="store_true", help="vaciar la cola y terminar")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    if args.once:
+        print(f"Ingesta: {drain_queue()} trabajos procesados")
+        return
+
+    listener = None
+    while not _stopping:
+        try:
+            if listener is None or listener.closed:
+                listener = listen_connection()
+            drain_queue()
+            # Esperar un NOTIFY (o POLL_SECONDS, para leases vencidos y reintentos)
+            if select.select([listener], [], [], POLL_SECONDS) != ([], [], []):
+                listener.poll()
+                listener.notifies.clear()
+        except psycopg2.Error:
+            traceback.print_exc()
+            if listener is not None:
+                try:
+                    listener.close()
+                except Exception:
+                    pass
+            listener = None
+            time.sleep(5)
+        except InterruptedError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
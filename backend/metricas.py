@@ -0,0 +1,395 @@
+"""
+Métricas por endpoint en formato de texto de Prometheus.
+
+Por cada ruta (la regla de Flask, p. ej. /observaciones/<int:id>) y método se
+acumula: histograma de latencia, requests por código de estado, sentencias SQL
+y su tiempo, filas devueltas, tiempo de serialización JSON y bytes de respuesta.
+
+Las sentencias se miden con TimedConnection (connection_factory de psycopg2):
+envuelve cualquier cursor_factory que pida el código (RealDictCursor, DictCursor)
+sin cambiar los handlers. Las que tardan SLOW_QUERY_MS o más se imprimen con la
+ruta que las ejecutó.
+
+Con gunicorn cada worker acumula las suyas; SharedDirectory las agrega: cada
+proceso vuelca sus acumuladores en un archivo de un directorio compartido
+(METRICS_DIR) y /metrics suma los de todos, así las series no saltan según el
+worker que atiende el scrape ni vuelven a cero cuando un worker se recicla.
+
+Módulo sin efectos secundarios al importarse.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+
+import psycopg2.extensions
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))  # 0 = sin log de consultas lentas
+SLOW_QUERY_MAX_CHARS = 300
+
+# Límites del histograma de latencia, en segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current = threading.local()
+
+
+class RequestStats:
+    """Lo acumulado por el request en curso (uno por hilo)."""
+    __slots__ = ("route", "started", "sql_count", "sql_seconds", "rows", "json_seconds", "slow", "exception")
+
+    def __init__(self, route):
+        self.route = route
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.json_seconds = 0.0
+        self.slow = 0
+        self.exception = None
+
+
+def begin(route):
+    _current.stats = RequestStats(route)
+    return _current.stats
+
+
+def end():
+    """Cierra el request en curso y devuelve sus RequestStats (o None)."""
+    stats = getattr(_current, "stats", None)
+    _current.stats = None
+    return stats
+
+
+def add_json_time(seconds):
+    stats = getattr(_current, "stats", None)
+    if stats is not None:
+        stats.json_seconds += seconds
+
+
+def record_exception(exc):
+    """Asocia la excepción (por su clase) al request en curso."""
+    stats = getattr(_current, "stats", None)
+    if stats is not None:
+        stats.exception = type(exc).__name__
+
+
+def _query_text(cursor, query):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        query = query.as_string(cursor)  # psycopg2.sql.Composed
+    return " ".join(query.split())[:SLOW_QUERY_MAX_CHARS]
+
+
+def _record_query(cursor, query, started):
+    seconds = time.perf_counter() - started
+    stats = getattr(_current, "stats", None)
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += seconds
+        # Cursores del lado del cliente: rowcount son las filas ya recibidas
+        if cursor.description is not None and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        if stats is not None:
+            stats.slow += 1
+        route = stats.route if stats is not None else "-"
+        print(f"Consulta lenta ({seconds * 1000:.0f} ms) en {route}: {_query_text(cursor, query)}")
+
+
+class _TimedCursorMixin:
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _record_query(self, query, started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            _record_query(self, query, started)
+
+
+_timed_classes = {}
+
+
+def _timed_cursor_class(factory):
+    cls = _timed_classes.get(factory)
+    if cls is None:
+        cls = _timed_classes[factory] = type("Timed" + factory.__name__, (_TimedCursorMixin, factory), {})
+    return cls
+
+
+class TimedConnection(psycopg2.extensions.connection):
+    """Conexión cuyos cursores registran cada sentencia en el request en curso."""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _timed_cursor_class(factory)
+        return super().cursor(*args, **kwargs)
+
+
+_ROUTE_FIELDS = ("count", "seconds", "sql_count", "sql_seconds", "rows", "json_seconds", "bytes", "slow")
+
+
+class RouteMetrics:
+    """Acumuladores por (ruta, método). Seguro entre hilos."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._routes = {}      # (route, method) -> dict de acumuladores
+        self._statuses = {}    # (route, method, status) -> count
+        self._exceptions = {}  # (route, method, exception) -> count
+        self.changed = False
+
+    def observe(self, method, status, stats, response_bytes):
+        seconds = time.perf_counter() - stats.started
+        key = (stats.route, method)
+        with self._lock:
+            m = self._routes.get(key)
+            if m is None:
+                m = self._routes[key] = {"buckets": [0] * len(self.buckets), **dict.fromkeys(_ROUTE_FIELDS, 0)}
+            for i, limit in enumerate(self.buckets):
+                if seconds <= limit:
+                    m["buckets"][i] += 1
+            m["count"] += 1
+            m["seconds"] += seconds
+            m["sql_count"] += stats.sql_count
+            m["sql_seconds"] += stats.sql_seconds
+            m["rows"] += stats.rows
+            m["json_seconds"] += stats.json_seconds
+            m["bytes"] += response_bytes
+            m["slow"] += stats.slow
+            skey = key + (str(status),)
+            self._statuses[skey] = self._statuses.get(skey, 0) + 1
+            if stats.exception:
+                ekey = key + (stats.exception,)
+                self._exceptions[ekey] = self._exceptions.get(ekey, 0) + 1
+            self.changed = True
+
+    def snapshot(self):
+        """Estado serializable a JSON (lo que se vuelca al directorio compartido)."""
+        with self._lock:
+            self.changed = False
+            return {
+                "buckets": list(self.buckets),
+                "routes": [[r, meth, dict(m, buckets=list(m["buckets"]))] for (r, meth), m in self._routes.items()],
+                "statuses": [list(k) + [n] for k, n in self._statuses.items()],
+                "exceptions": [list(k) + [n] for k, n in self._exceptions.items()],
+            }
+
+    def families(self):
+        return families([self.snapshot()])
+
+
+def merge(snapshots):
+    """Suma snapshots de RouteMetrics (de distintos procesos)."""
+    merged = {"buckets": list(LATENCY_BUCKETS), "routes": {}, "statuses": {}, "exceptions": {}}
+    for snap in snapshots:
+        if snap.get("buckets") != merged["buckets"]:
+            continue  # otro proceso con límites distintos (versión anterior)
+        for route, method, m in snap.get("routes", ()):
+            acc = merged["routes"].get((route, method))
+            if acc is None:
+                merged["routes"][(route, method)] = dict(m, buckets=list(m["buckets"]))
+                continue
+            acc["buckets"] = [a + b for a, b in zip(acc["buckets"], m["buckets"])]
+            for field in _ROUTE_FIELDS:
+                acc[field] += m.get(field, 0)
+        for name in ("statuses", "exceptions"):
+            for *key, n in snap.get(name, ()):
+                key = tuple(key)
+                merged[name][key] = merged[name].get(key, 0) + n
+    return {
+        "buckets": merged["buckets"],
+        "routes": [[r, meth, m] for (r, meth), m in merged["routes"].items()],
+        "statuses": [list(k) + [n] for k, n in merged["statuses"].items()],
+        "exceptions": [list(k) + [n] for k, n in merged["exceptions"].items()],
+    }
+
+
+def families(snapshots):
+    """[(nombre, tipo, ayuda, [(labels, valor)])] para render()."""
+    snap = merge(snapshots)
+    buckets = snap["buckets"]
+    routes = {(r, meth): m for r, meth, m in snap["routes"]}
+
+    latency = []
+    for (route, method), m in sorted(routes.items()):
+        labels = {"route": route, "method": method}
+        for limit, n in zip(buckets, m["buckets"]):
+            latency.append(("_bucket", dict(labels, le=repr(limit)), n))
+        latency.append(("_bucket", dict(labels, le="+Inf"), m["count"]))
+        latency.append(("_sum", labels, m["seconds"]))
+        latency.append(("_count", labels, m["count"]))
+
+    def counter(field):
+        return [({"route": r, "method": meth}, m[field]) for (r, meth), m in sorted(routes.items())]
+
+    return [
+        ("gwp_http_request_duration_seconds", "histogram",
+         "Latencia de los requests por ruta", latency),
+        ("gwp_http_requests_total", "counter", "Requests por ruta y código de estado",
+         [({"route": r, "method": meth, "status": s}, n) for r, meth, s, n in sorted(snap["statuses"])]),
+        ("gwp_http_exceptions_total", "counter", "Excepciones no previstas por ruta (respuesta 500)",
+         [({"route": r, "method": meth, "exception": e}, n) for r, meth, e, n in sorted(snap["exceptions"])]),
+        ("gwp_http_sql_statements_total", "counter", "Sentencias SQL ejecutadas", counter("sql_count")),
+        ("gwp_http_sql_seconds_total", "counter", "Tiempo en sentencias SQL", counter("sql_seconds")),
+        ("gwp_http_sql_rows_total", "counter", "Filas devueltas por las consultas", counter("rows")),
+        ("gwp_http_sql_slow_total", "counter",
+         f"Sentencias de {SLOW_QUERY_MS:g} ms o más", counter("slow")),
+        ("gwp_http_json_seconds_total", "counter", "Tiempo serializando JSON", counter("json_seconds")),
+        ("gwp_http_response_bytes_total", "counter",
+         "Bytes de respuesta (sin contar las respuestas en streaming)", counter("bytes")),
+    ]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedDirectory:
+    """Agregación entre procesos a través de un directorio.
+
+    Cada proceso escribe su snapshot de RouteMetrics en <directorio>/<pid>-<id>.json
+    cada `flush_seconds` si hubo cambios y al salir. `extra()` puede agregar
+    {"counters": {...}, "gauges": {...}} propios del proceso (p. ej. el pool).
+    collect() lee todos; los archivos de procesos que ya no existen se compactan
+    en archivados.json (bajo flock) para que el directorio no crezca con cada
+    reciclado de workers. De ellos se conservan los counters, no los gauges."""
+
+    ARCHIVE = "archivados.json"
+
+    def __init__(self, directory, metrics, extra=None, flush_seconds=5.0):
+        self.directory = directory
+        self.metrics = metrics
+        self.extra = extra
+        self.flush_seconds = flush_seconds
+        self._pid = None
+        self._path = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        threading.Thread(target=self._flush_loop, name="metricas-flush", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            if self.metrics.changed:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print("Métricas: no se pudo escribir el snapshot:", e)
+
+    def _write(self, path, data):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def flush(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Nombre por proceso (con id al azar: los pids se reutilizan)
+                self._pid = os.getpid()
+                self._path = os.path.join(self.directory, f"{self._pid}-{uuid.uuid4().hex[:8]}.json")
+            data = dict(self.metrics.snapshot(), pid=self._pid)
+            if self.extra is not None:
+                data.update(self.extra())
+            self._write(self._path, data)
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def collect(self):
+        """Snapshots de todos los procesos (solo los vivos traen gauges). El
+        propio se escribe antes, así el scrape ve sus últimos requests."""
+        self.flush()
+        live, dead = [], []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            if os.path.basename(path) == self.ARCHIVE:
+                continue
+            snap = self._read(path)
+            if snap is not None:
+                (live if _pid_alive(snap.get("pid", 0)) else dead).append((path, snap))
+        archive = self._compact(dead) if dead else self._read(os.path.join(self.directory, self.ARCHIVE))
+        result = [snap for _, snap in live]
+        if archive:
+            result.append(archive)
+        return result
+
+    def _compact(self, dead):
+        """Suma los archivos de procesos muertos al archivo de archivados y los
+        borra. `merged` recuerda el último lote: si se corta entre escribir el
+        archivo y borrar, el próximo intento no los cuenta dos veces."""
+        archive_path = os.path.join(self.directory, self.ARCHIVE)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = self._read(archive_path) or {}
+            done = set(archive.get("merged", ()))
+            names = [os.path.basename(p) for p, _ in dead]
+            pending = [snap for (p, snap), name in zip(dead, names) if name not in done and os.path.exists(p)]
+            if pending:
+                archive = dict(merge([archive] + pending if archive else pending),
+                               counters=sum_values([archive] + pending, "counters"),
+                               merged=names)
+                self._write(archive_path, archive)
+            for path, _ in dead:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return archive
+
+
+def sum_values(snapshots, kind):
+    """Suma por nombre los "counters" o "gauges" de varios snapshots."""
+    total = {}
+    for snap in snapshots:
+        for name, value in (snap.get(kind) or {}).items():
+            total[name] = total.get(name, 0) + value
+    return total
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render(families):
+    """Texto de exposición de Prometheus (version 0.0.4). Las muestras son
+    (labels, valor) o, en histogramas, (sufijo, labels, valor)."""
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            suffix, labels, value = sample if len(sample) == 3 else ("",) + tuple(sample)
+            value = value if isinstance(value, int) else round(float(value), 6)
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
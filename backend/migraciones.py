@@ -0,0 +1,179 @@
+"""
+Migraciones versionadas del esquema.
+
+Cada archivo database/migrations/NNNN_nombre.sql se aplica una sola vez, en
+orden, dentro de su propia transacción, y queda registrado en schema_migrations.
+Para cambiar el esquema se agrega un archivo nuevo; los ya aplicados no se editan:
+se guarda el SHA-256 de cada archivo y si cambia después de aplicado el arranque
+falla con MigrationError en vez de dejar el esquema a medias.
+
+Con el esquema al día bastan dos consultas de lectura y no se toma ningún lock. Si hay
+pendientes, se aplican bajo un advisory lock para que varios workers arrancando
+a la vez no compitan (el segundo espera y encuentra todo aplicado).
+
+Módulo sin efectos secundarios al importarse: lo usa create_app() del backend.
+
+    cd backend
+    python migraciones.py            # aplica las pendientes
+    python migraciones.py --status   # solo muestra el estado
+"""
+import argparse
+import hashlib
+import os
+import re
+
+MIGRATIONS_DIR = os.getenv("MIGRATIONS_DIR", os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "database", "migrations"))
+
+_FILE_RE = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+# Clave del advisory lock de sesión que serializa a quienes migran
+MIGRATIONS_LOCK_KEY = 7_210_024
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+def checksum(sql):
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """[(version, nombre, sql)] ordenadas por versión."""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILE_RE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            migrations.append((match.group(1), match.group(2), f.read()))
+    versions = [m[0] for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Versiones de migración repetidas en {directory}")
+    return migrations
+
+
+def _applied_checksums(conn):
+    """{version: checksum} de lo aplicado; None si schema_migrations no existe
+    todavía o es anterior a la columna checksum."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND table_name = 'schema_migrations' AND column_name = 'checksum'
+        """)
+        if not cur.fetchone()[0]:
+            conn.rollback()
+            return None
+        cur.execute("SELECT version, checksum FROM schema_migrations")
+        applied = dict(cur.fetchall())
+    conn.rollback()
+    return applied
+
+
+def _verify(migrations, applied):
+    """Falla si una migración aplicada cambió. Devuelve las pendientes."""
+    pending = []
+    for version, nombre, sql in migrations:
+        if version not in applied:
+            pending.append((version, nombre, sql))
+        elif applied[version] is not None and applied[version] != checksum(sql):
+            raise MigrationError(
+                f"La migración {version}_{nombre} cambió después de aplicarse; "
+                "agregue una migración nueva en vez de editarla"
+            )
+    return pending
+
+
+def migration_status(conn, directory=MIGRATIONS_DIR):
+    """[(version, nombre, estado)] con estado 'aplicada', 'pendiente' o 'modificada'."""
+    applied = _applied_checksums(conn) or {}
+    result = []
+    for version, nombre, sql in load_migrations(directory):
+        if version not in applied:
+            estado = "pendiente"
+        elif applied[version] not in (None, checksum(sql)):
+            estado = "modificada"
+        else:
+            estado = "aplicada"
+        result.append((version, nombre, estado))
+    return result
+
+
+def apply_migrations(conn, directory=MIGRATIONS_DIR, log=print):
+    """Aplica las migraciones pendientes. Devuelve las versiones aplicadas."""
+    migrations = load_migrations(directory)
+    applied = _applied_checksums(conn)
+    if applied is not None and None not in applied.values() and not _verify(migrations, applied):
+        return []
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_KEY,))
+    conn.commit()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version VARCHAR(10) PRIMARY KEY,
+                    nombre VARCHAR(200) NOT NULL,
+                    checksum CHAR(64),
+                    aplicada_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cur.execute("ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS checksum CHAR(64)")
+            cur.execute("SELECT version, checksum FROM schema_migrations")
+            applied = dict(cur.fetchall())
+            # Registros anteriores a la columna: se toma el archivo actual como referencia
+            for version, nombre, sql in migrations:
+                if version in applied and applied[version] is None:
+                    cur.execute("UPDATE schema_migrations SET checksum = %s WHERE version = %s",
+                                (checksum(sql), version))
+                    applied[version] = checksum(sql)
+        conn.commit()
+        pending = _verify(migrations, applied)
+
+        done = []
+        for version, nombre, sql in pending:
+            log(f"Aplicando migración {version}_{nombre}...")
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, nombre, checksum) VALUES (%s, %s, %s)",
+                        (version, nombre, checksum(sql)),
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            done.append(version)
+        return done
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_KEY,))
+        conn.commit()
+
+
+def main():
+    import psycopg2
+    from app1 import DB_CONNECTION_STRING
+
+    parser = argparse.ArgumentParser(description="Migraciones del esquema GWP")
+    parser.add_argument("--status", action="store_true", help="mostrar el estado sin aplicar nada")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(DB_CONNECTION_STRING)
+    try:
+        if args.status:
+            for version, nombre, estado in migration_status(conn):
+                print(f"{version}_{nombre}: {estado}")
+        else:
+            done = apply_migrations(conn)
+            print(f"{len(done)} migraciones aplicadas" if done else "Esquema al día")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Fragmentación y tokenización para el índice de recuperación (BM25).
+
+Módulo sin efectos secundarios al importarse: lo usan el backend y el worker
+de ingesta. El puntaje BM25 se calcula en SQL sobre las tablas
+repositorio_fragmentos / repositorio_terminos.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+# Fragmentos de ~CHUNK_WORDS palabras que se solapan en CHUNK_OVERLAP palabras,
+# para que una idea partida en el borde quede entera en alguno de los dos.
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 50
+
+MAX_TERM_LENGTH = 60
+
+# Parámetros BM25 estándar
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Stopwords en español (sin tildes, igual que los términos tokenizados)
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes asi aun aunque bajo
+bien cada casi como con contra cual cuales cuando de del desde donde dos e el
+ella ellas ello ellos en entre era eran es esa esas ese eso esos esta estaba
+estado estan estar estas este esto estos fue fueron ha habia han hasta hay la
+las le les lo los mas me mi mientras muy ni no nos o otra otras otro otros para
+pero poco por porque que quien se sea segun ser si sido sin sobre solo son su
+sus tambien tan tanto te tiene tienen todo todos tras tu un una uno unos y ya
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Minúsculas y sin tildes/diacríticos (ñ -> n)."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Lista de términos indexables de un texto (en orden, con repeticiones)."""
+    if not text:
+        return []
+    return [
+        t[:MAX_TERM_LENGTH] for t in _TOKEN_RE.findall(normalize(text))
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+def chunk_text(text, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Divide el texto en fragmentos de `size` palabras con `overlap` de solape."""
+    words = (text or "").split()
+    if not words:
+        return []
+    step = max(size - overlap, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
+
+
+def build_chunks(metadata_text, file_text):
+    """Fragmentos de un documento como [(orden, contenido, frecuencias)].
+    El fragmento 0 son los metadatos (título, etiquetas, resúmenes), así un
+    documento sin archivo también es recuperable."""
+    chunks = []
+    if metadata_text and metadata_text.strip():
+        chunks.append(metadata_text.strip())
+    chunks.extend(chunk_text(file_text))
+
+    result = []
+    for content in chunks:
+        freqs = Counter(tokenize(content))
+        if freqs:
+            result.append((len(result), content, freqs))
+    return result
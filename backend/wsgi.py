@@ -0,0 +1,12 @@
+"""
+Punto de entrada WSGI para producción.
+
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+TLS se termina en el proxy (nginx, etc.), no en la app: gunicorn escucha HTTP
+plano en GWP_BIND (por defecto 127.0.0.1:8002).
+"""
+from app1 import create_app
+
+app = create_app()
@@ -0,0 +1,209 @@
+-- Estado del esquema que antes verificaba check_and_create_tables() en cada
+-- arranque. Es idempotente: se puede aplicar sobre una base creada con
+-- schema.sql o sobre una que ya tenía estos cambios.
+
+-- Repositorio estratégico y bitácora
+CREATE TABLE IF NOT EXISTS repositorio_documentos (
+    id SERIAL PRIMARY KEY,
+    titulo VARCHAR(255) NOT NULL,
+    tipo_documento VARCHAR(100),
+    descripcion TEXT,
+    puntos_clave TEXT,
+    ruta_archivo VARCHAR(500),
+    fecha_publicacion DATE,
+    fuente_origen VARCHAR(100),
+    tipo_fuente VARCHAR(50),
+    enlace_externo VARCHAR(500),
+    estado_procesamiento VARCHAR(50) DEFAULT 'Pendiente',
+    etiquetas VARCHAR(255),
+    uploaded_by INTEGER REFERENCES usuarios(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS observaciones (
+    id SERIAL PRIMARY KEY,
+    plan_maestro_id INTEGER NOT NULL REFERENCES plan_maestro(id) ON DELETE CASCADE,
+    usuario_id INTEGER REFERENCES usuarios(id),
+    texto TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cache persistente de texto extraído
+CREATE TABLE IF NOT EXISTS repositorio_texto (
+    ruta_archivo VARCHAR(500) PRIMARY KEY,
+    mtime_ns BIGINT NOT NULL,
+    tamano_bytes BIGINT NOT NULL,
+    contenido TEXT NOT NULL,
+    extraido_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Búsqueda full-text en repositorio
+ALTER TABLE repositorio_documentos ADD COLUMN IF NOT EXISTS search_vector tsvector;
+CREATE INDEX IF NOT EXISTS idx_repositorio_search
+    ON repositorio_documentos USING GIN (search_vector);
+
+-- Índice de recuperación por fragmentos (BM25)
+CREATE TABLE IF NOT EXISTS repositorio_fragmentos (
+    id BIGSERIAL PRIMARY KEY,
+    documento_id INTEGER NOT NULL REFERENCES repositorio_documentos(id) ON DELETE CASCADE,
+    orden INTEGER NOT NULL,
+    contenido TEXT NOT NULL,
+    num_terminos INTEGER NOT NULL,
+    UNIQUE (documento_id, orden)
+);
+CREATE TABLE IF NOT EXISTS repositorio_terminos (
+    termino VARCHAR(60) NOT NULL,
+    fragmento_id BIGINT NOT NULL REFERENCES repositorio_fragmentos(id) ON DELETE CASCADE,
+    frecuencia INTEGER NOT NULL,
+    PRIMARY KEY (termino, fragmento_id)
+);
+CREATE INDEX IF NOT EXISTS idx_repositorio_terminos_fragmento
+    ON repositorio_terminos(fragmento_id);
+
+-- Subidas por partes + hash en documentos
+ALTER TABLE documentos ADD COLUMN IF NOT EXISTS hash_sha256 CHAR(64);
+
+CREATE TABLE IF NOT EXISTS subidas (
+    id CHAR(32) PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    nombre_archivo VARCHAR(255) NOT NULL,
+    tipo_mime VARCHAR(50),
+    tamano_total BIGINT NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Blobs por contenido con conteo de referencias
+CREATE TABLE IF NOT EXISTS blobs (
+    ruta VARCHAR(200) PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL,
+    tamano_bytes BIGINT NOT NULL,
+    referencias INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cola de ingesta (worker en segundo plano) + datos del archivo
+ALTER TABLE repositorio_documentos
+    ADD COLUMN IF NOT EXISTS hash_sha256 CHAR(64),
+    ADD COLUMN IF NOT EXISTS paginas INTEGER,
+    ADD COLUMN IF NOT EXISTS tamano_bytes BIGINT;
+
+CREATE TABLE IF NOT EXISTS trabajos_ingesta (
+    id BIGSERIAL PRIMARY KEY,
+    documento_id INTEGER NOT NULL REFERENCES repositorio_documentos(id) ON DELETE CASCADE,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    disponible_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    lease_hasta TIMESTAMP WITH TIME ZONE,
+    ultimo_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_ingesta_cola
+    ON trabajos_ingesta(estado, disponible_at);
+
+-- Documentos nunca indexados: el worker calcula search_vector y fragmentos
+INSERT INTO trabajos_ingesta (documento_id)
+SELECT r.id FROM repositorio_documentos r
+WHERE (r.search_vector IS NULL
+       OR NOT EXISTS (SELECT 1 FROM repositorio_fragmentos f WHERE f.documento_id = r.id))
+  AND NOT EXISTS (
+      SELECT 1 FROM trabajos_ingesta j
+      WHERE j.documento_id = r.id AND j.estado = 'pendiente'
+  );
+SELECT pg_notify('gwp_ingesta', '');
+
+-- Sync incremental: updated_at en todas las tablas sincronizables + tombstones
+ALTER TABLE documentos
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+
+DROP TRIGGER IF EXISTS update_documentos_modtime ON documentos;
+CREATE TRIGGER update_documentos_modtime BEFORE UPDATE ON documentos
+    FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+DROP TRIGGER IF EXISTS update_observaciones_modtime ON observaciones;
+CREATE TRIGGER update_observaciones_modtime BEFORE UPDATE ON observaciones
+    FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+
+CREATE TABLE IF NOT EXISTS registros_eliminados (
+    id BIGSERIAL PRIMARY KEY,
+    tabla VARCHAR(50) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_registros_eliminados_fecha
+    ON registros_eliminados(deleted_at, tabla);
+
+CREATE OR REPLACE FUNCTION registrar_eliminacion()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO registros_eliminados (tabla, registro_id) VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS plan_maestro_tombstone ON plan_maestro;
+CREATE TRIGGER plan_maestro_tombstone AFTER DELETE ON plan_maestro
+    FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+DROP TRIGGER IF EXISTS hitos_tombstone ON hitos;
+CREATE TRIGGER hitos_tombstone AFTER DELETE ON hitos
+    FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+DROP TRIGGER IF EXISTS documentos_tombstone ON documentos;
+CREATE TRIGGER documentos_tombstone AFTER DELETE ON documentos
+    FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+DROP TRIGGER IF EXISTS observaciones_tombstone ON observaciones;
+CREATE TRIGGER observaciones_tombstone AFTER DELETE ON observaciones
+    FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+
+-- Feed de cambios: NOTIFY 'gwp_cambios' por cada fila escrita
+CREATE OR REPLACE FUNCTION notificar_cambio()
+RETURNS TRIGGER AS $$
+DECLARE
+    fila_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN fila_id := OLD.id; ELSE fila_id := NEW.id; END IF;
+    PERFORM pg_notify('gwp_cambios',
+        json_build_object('tabla', TG_TABLE_NAME, 'op', TG_OP, 'id', fila_id)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS plan_maestro_notify ON plan_maestro;
+CREATE TRIGGER plan_maestro_notify AFTER INSERT OR UPDATE OR DELETE ON plan_maestro
+    FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+DROP TRIGGER IF EXISTS hitos_notify ON hitos;
+CREATE TRIGGER hitos_notify AFTER INSERT OR UPDATE OR DELETE ON hitos
+    FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+DROP TRIGGER IF EXISTS documentos_notify ON documentos;
+CREATE TRIGGER documentos_notify AFTER INSERT OR UPDATE OR DELETE ON documentos
+    FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+DROP TRIGGER IF EXISTS observaciones_notify ON observaciones;
+CREATE TRIGGER observaciones_notify AFTER INSERT OR UPDATE OR DELETE ON observaciones
+    FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+DROP TRIGGER IF EXISTS repositorio_documentos_notify ON repositorio_documentos;
+CREATE TRIGGER repositorio_documentos_notify AFTER INSERT OR UPDATE OR DELETE ON repositorio_documentos
+    FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+DROP TRIGGER IF EXISTS usuarios_notify ON usuarios;
+CREATE TRIGGER usuarios_notify AFTER INSERT OR UPDATE OR DELETE ON usuarios
+    FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+
+-- Sesiones (tokens compartidos entre workers, con expiración)
+CREATE TABLE IF NOT EXISTS sesiones (
+    token_hash CHAR(64) PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_sesiones_expires_at ON sesiones(expires_at);
+
+-- Estados del plan: la transición diaria la hace el backend; se quita el job
+-- de pg_cron si existía (reescribía y notificaba todo el plan)
+CREATE INDEX IF NOT EXISTS idx_plan_status_fecha_fin ON plan_maestro(status, fecha_fin);
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.unschedule(jobid) FROM cron.job
+        WHERE jobname = 'actualizar-plan-maestro';
+    END IF;
+END $$;
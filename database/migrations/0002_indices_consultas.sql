@@ -0,0 +1,18 @@
+-- Índices para las consultas más frecuentes del backend.
+--
+-- hitos/documentos/observaciones por actividad (vista de detalle, /plan-maestro/details):
+-- filtran por plan_maestro_id y ordenan por fecha, el índice entrega las filas
+-- ya ordenadas. repositorio: listado y paginación keyset por (created_at, id).
+-- usuarios.username ya tiene índice por su restricción UNIQUE.
+--
+-- Sin CONCURRENTLY porque cada migración corre en una transacción; con tablas
+-- grandes en producción conviene crearlos antes a mano con CONCURRENTLY (el
+-- IF NOT EXISTS hace que esta migración los salte).
+CREATE INDEX IF NOT EXISTS idx_hitos_plan_fecha
+    ON hitos(plan_maestro_id, fecha_estimada);
+CREATE INDEX IF NOT EXISTS idx_documentos_plan_created
+    ON documentos(plan_maestro_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_observaciones_plan_created
+    ON observaciones(plan_maestro_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_repositorio_created
+    ON repositorio_documentos(created_at DESC, id DESC);
@@ -0,0 +1,14 @@
+-- Nombre original del archivo subido al repositorio.
+--
+-- Desde el almacenamiento por contenido ruta_archivo es blobs/ab/cd/<sha256>.ext
+-- y el nombre que subió el usuario se perdía; las descargas salían con el hash.
+-- Las filas antiguas REPO_<timestamp>_<nombre> lo recuperan de la ruta; las de
+-- blobs ya subidas toman el título más la extensión.
+ALTER TABLE repositorio_documentos ADD COLUMN IF NOT EXISTS nombre_archivo VARCHAR(255);
+
+UPDATE repositorio_documentos
+SET nombre_archivo = CASE
+        WHEN ruta_archivo ~ '^REPO_[0-9]+_' THEN regexp_replace(ruta_archivo, '^REPO_[0-9]+_', '')
+        ELSE LEFT(titulo, 240) || COALESCE(substring(ruta_archivo FROM '\.[^./]+$'), '')
+    END
+WHERE nombre_archivo IS NULL AND ruta_archivo IS NOT NULL;
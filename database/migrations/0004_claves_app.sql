@@ -0,0 +1,8 @@
+-- Claves del backend compartidas por todos los workers (p. ej. la que firma los
+-- tickets de descarga / EventSource cuando no se define SECRET_KEY). La crea el
+-- primer worker que la necesita.
+CREATE TABLE IF NOT EXISTS claves_app (
+    nombre VARCHAR(50) PRIMARY KEY,
+    valor CHAR(64) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
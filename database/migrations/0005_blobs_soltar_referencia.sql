@@ -0,0 +1,31 @@
+-- Referencias a blobs mantenidas por la base.
+--
+-- El backend restaba la referencia solo en sus propios DELETE; las filas que se
+-- borran en cascada (documentos al borrar una actividad del plan) o por SQL
+-- manual nunca la soltaban y su archivo quedaba para siempre. Ahora la resta un
+-- trigger AFTER DELETE; los blobs que llegan a 0 los borra el backend
+-- (purge_orphan_blobs), que es quien tiene los archivos.
+CREATE OR REPLACE FUNCTION soltar_blob()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.ruta_archivo IS NOT NULL THEN
+        UPDATE blobs SET referencias = referencias - 1 WHERE ruta = OLD.ruta_archivo;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS documentos_soltar_blob ON documentos;
+CREATE TRIGGER documentos_soltar_blob AFTER DELETE ON documentos
+    FOR EACH ROW EXECUTE PROCEDURE soltar_blob();
+DROP TRIGGER IF EXISTS repositorio_documentos_soltar_blob ON repositorio_documentos;
+CREATE TRIGGER repositorio_documentos_soltar_blob AFTER DELETE ON repositorio_documentos
+    FOR EACH ROW EXECUTE PROCEDURE soltar_blob();
+
+-- Reconciliar con las filas que de verdad apuntan a cada blob (corrige lo que
+-- ya perdieron los borrados en cascada anteriores)
+UPDATE blobs b
+SET referencias = (SELECT COUNT(*) FROM documentos d WHERE d.ruta_archivo = b.ruta)
+                + (SELECT COUNT(*) FROM repositorio_documentos r WHERE r.ruta_archivo = b.ruta);
+
+CREATE INDEX IF NOT EXISTS idx_blobs_huerfanos ON blobs(ruta) WHERE referencias <= 0;
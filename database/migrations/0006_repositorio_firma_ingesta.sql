@@ -0,0 +1,4 @@
+-- Firma (ruta:mtime_ns:tamaño) del archivo que el worker de ingesta ya hasheó y
+-- paginó. Cada edición de metadatos re-encola la ingesta para reindexar la
+-- búsqueda; con la firma igual el worker no vuelve a leer el archivo entero.
+ALTER TABLE repositorio_documentos ADD COLUMN IF NOT EXISTS firma_ingesta VARCHAR(600);
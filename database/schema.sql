@@ -47,6 +47,7 @@ CREATE TABLE plan_maestro (
 );
 
 CREATE INDEX idx_plan_activity_code ON plan_maestro(activity_code);
+CREATE INDEX idx_plan_status_fecha_fin ON plan_maestro(status, fecha_fin);
 
 -- 3. Tabla de Hitos
 CREATE TABLE hitos (
@@ -64,6 +65,7 @@ CREATE TABLE hitos (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX idx_hitos_plan_fecha ON hitos(plan_maestro_id, fecha_estimada);
 
 -- 4. Tabla de Documentos
 CREATE TABLE documentos (
@@ -72,12 +74,15 @@ CREATE TABLE documentos (
     
     nombre_archivo VARCHAR(255) NOT NULL,
     ruta_archivo TEXT NOT NULL,
-    tipo_archivo VARCHAR(50),
+    tipo_archivo VARCHAR(50), -- MIME
     tamano_bytes BIGINT,
+    hash_sha256 CHAR(64),
     
     uploaded_by INTEGER REFERENCES usuarios(id),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX idx_documentos_plan_created ON documentos(plan_maestro_id, created_at DESC);
 
 -- 5. Tabla de Observaciones (Bitácora)
 CREATE TABLE observaciones (
@@ -89,6 +94,7 @@ CREATE TABLE observaciones (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX idx_observaciones_plan_created ON observaciones(plan_maestro_id, created_at DESC);
 
 -- 6. Tabla de Repositorio de Documentos Estratégicos (Biblioteca)
 CREATE TABLE repositorio_documentos (
@@ -98,6 +104,7 @@ CREATE TABLE repositorio_documentos (
     descripcion TEXT, -- Resumen ejecutivo
     puntos_clave TEXT, -- JSON o Texto plano con bullets
     ruta_archivo VARCHAR(500), -- Path local uploads
+    nombre_archivo VARCHAR(255), -- Nombre original (ruta_archivo es el blob por hash)
     fecha_publicacion DATE, -- anno_publicacion
     fuente_origen VARCHAR(100), -- CONAF, MMA, etc.
     tipo_fuente VARCHAR(50), -- Gobierno, Privado, ONG, etc.
@@ -105,12 +112,118 @@ CREATE TABLE repositorio_documentos (
     estado_procesamiento VARCHAR(50) DEFAULT 'Pendiente', -- Pendiente, Resumido, Indexado
     etiquetas VARCHAR(255), -- Tags separados por coma
     resumen_largo TEXT,
+    hash_sha256 CHAR(64), -- Datos del archivo (los completa el worker de ingesta)
+    paginas INTEGER,
+    tamano_bytes BIGINT,
+    firma_ingesta VARCHAR(600), -- ruta:mtime_ns:tamaño del archivo ya hasheado (el worker no lo repite)
+    search_vector tsvector, -- Full-text (spanish): metadatos + texto extraído, lo mantiene el backend
     
     uploaded_by INTEGER REFERENCES usuarios(id),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_repositorio_search ON repositorio_documentos USING GIN (search_vector);
+CREATE INDEX idx_repositorio_created ON repositorio_documentos(created_at DESC, id DESC);
+
+-- 7. Cache persistente de texto extraído de archivos (PDF/DOCX/texto)
+-- Clave: ruta_archivo + mtime/tamaño del archivo físico al momento de extraer.
+CREATE TABLE repositorio_texto (
+    ruta_archivo VARCHAR(500) PRIMARY KEY,
+    mtime_ns BIGINT NOT NULL,
+    tamano_bytes BIGINT NOT NULL,
+    contenido TEXT NOT NULL,
+    extraido_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 8. Sesiones (token guardado como sha256, con expiración; compartidas entre workers)
+CREATE TABLE sesiones (
+    token_hash CHAR(64) PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_sesiones_expires_at ON sesiones(expires_at);
+
+-- 9. Índice de recuperación (BM25): fragmentos solapados + lista invertida de términos
+CREATE TABLE repositorio_fragmentos (
+    id BIGSERIAL PRIMARY KEY,
+    documento_id INTEGER NOT NULL REFERENCES repositorio_documentos(id) ON DELETE CASCADE,
+    orden INTEGER NOT NULL, -- 0 = metadatos del documento
+    contenido TEXT NOT NULL,
+    num_terminos INTEGER NOT NULL,
+    UNIQUE (documento_id, orden)
+);
+
+CREATE TABLE repositorio_terminos (
+    termino VARCHAR(60) NOT NULL, -- minúsculas, sin tildes, sin stopwords
+    fragmento_id BIGINT NOT NULL REFERENCES repositorio_fragmentos(id) ON DELETE CASCADE,
+    frecuencia INTEGER NOT NULL,
+    PRIMARY KEY (termino, fragmento_id)
+);
+CREATE INDEX idx_repositorio_terminos_fragmento ON repositorio_terminos(fragmento_id);
+
+-- 10. Subidas por partes (reanudables). Los bytes están en uploads/.parciales/<id>.part
+CREATE TABLE subidas (
+    id CHAR(32) PRIMARY KEY,
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    nombre_archivo VARCHAR(255) NOT NULL,
+    tipo_mime VARCHAR(50),
+    tamano_total BIGINT NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 11. Almacenamiento por contenido: uploads/blobs/ab/cd/<sha256><ext>, una copia por contenido.
+-- ruta_archivo de documentos/repositorio apunta a `ruta`; el archivo se borra al llegar a 0 referencias.
+CREATE TABLE blobs (
+    ruta VARCHAR(200) PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL,
+    tamano_bytes BIGINT NOT NULL,
+    referencias INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_blobs_huerfanos ON blobs(ruta) WHERE referencias <= 0;
+
+-- Cada fila borrada (también en cascada o por SQL manual) suelta su referencia;
+-- los blobs en 0 los borra el backend (purge_orphan_blobs)
+CREATE OR REPLACE FUNCTION soltar_blob()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.ruta_archivo IS NOT NULL THEN
+        UPDATE blobs SET referencias = referencias - 1 WHERE ruta = OLD.ruta_archivo;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER documentos_soltar_blob AFTER DELETE ON documentos
+    FOR EACH ROW EXECUTE PROCEDURE soltar_blob();
+CREATE TRIGGER repositorio_documentos_soltar_blob AFTER DELETE ON repositorio_documentos
+    FOR EACH ROW EXECUTE PROCEDURE soltar_blob();
+
+-- 12. Cola de ingesta del repositorio (la procesa backend/ingesta_worker.py)
+-- estado: pendiente -> procesando (con lease) -> se borra al terminar | error tras reintentos
+CREATE TABLE trabajos_ingesta (
+    id BIGSERIAL PRIMARY KEY,
+    documento_id INTEGER NOT NULL REFERENCES repositorio_documentos(id) ON DELETE CASCADE,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    disponible_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    lease_hasta TIMESTAMP WITH TIME ZONE,
+    ultimo_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_trabajos_ingesta_cola ON trabajos_ingesta(estado, disponible_at);
+
+-- 13. Claves del backend compartidas entre workers (firma de tickets sin SECRET_KEY)
+CREATE TABLE claves_app (
+    nombre VARCHAR(50) PRIMARY KEY,
+    valor CHAR(64) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Funciones de ayuda
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -123,30 +236,73 @@ $$ language 'plpgsql';
 CREATE TRIGGER update_usuarios_modtime BEFORE UPDATE ON usuarios FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
 CREATE TRIGGER update_plan_maestro_modtime BEFORE UPDATE ON plan_maestro FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
 CREATE TRIGGER update_hitos_modtime BEFORE UPDATE ON hitos FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+CREATE TRIGGER update_documentos_modtime BEFORE UPDATE ON documentos FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+CREATE TRIGGER update_observaciones_modtime BEFORE UPDATE ON observaciones FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+
+-- Tombstones para sync incremental (/sync): registra cada fila eliminada
+CREATE TABLE registros_eliminados (
+    id BIGSERIAL PRIMARY KEY,
+    tabla VARCHAR(50) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_registros_eliminados_fecha ON registros_eliminados(deleted_at, tabla);
+
+CREATE OR REPLACE FUNCTION registrar_eliminacion()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO registros_eliminados (tabla, registro_id) VALUES (TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER plan_maestro_tombstone AFTER DELETE ON plan_maestro FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+CREATE TRIGGER hitos_tombstone AFTER DELETE ON hitos FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+CREATE TRIGGER documentos_tombstone AFTER DELETE ON documentos FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+CREATE TRIGGER observaciones_tombstone AFTER DELETE ON observaciones FOR EACH ROW EXECUTE PROCEDURE registrar_eliminacion();
+
+-- Feed de cambios: NOTIFY 'gwp_cambios' con {tabla, op, id} por cada fila escrita
+CREATE OR REPLACE FUNCTION notificar_cambio()
+RETURNS TRIGGER AS $$
+DECLARE
+    fila_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN fila_id := OLD.id; ELSE fila_id := NEW.id; END IF;
+    PERFORM pg_notify('gwp_cambios',
+        json_build_object('tabla', TG_TABLE_NAME, 'op', TG_OP, 'id', fila_id)::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER plan_maestro_notify AFTER INSERT OR UPDATE OR DELETE ON plan_maestro FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+CREATE TRIGGER hitos_notify AFTER INSERT OR UPDATE OR DELETE ON hitos FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+CREATE TRIGGER documentos_notify AFTER INSERT OR UPDATE OR DELETE ON documentos FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+CREATE TRIGGER observaciones_notify AFTER INSERT OR UPDATE OR DELETE ON observaciones FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+CREATE TRIGGER repositorio_documentos_notify AFTER INSERT OR UPDATE OR DELETE ON repositorio_documentos FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
+CREATE TRIGGER usuarios_notify AFTER INSERT OR UPDATE OR DELETE ON usuarios FOR EACH ROW EXECUTE PROCEDURE notificar_cambio();
 
 
 
+-- Transición Pendiente -> En Progreso de actividades vencidas. Ni el backend ni
+-- pg_cron la ejecutan: los listados derivan ese estado al leer contra
+-- CURRENT_DATE (y estado_derivado: vencida / por vencer). Queda para uso manual.
 CREATE OR REPLACE FUNCTION actualizar_plan_maestro_por_fecha()
-RETURNS void AS $$
+RETURNS INTEGER AS $$
+DECLARE
+    filas_actualizadas INTEGER;
 BEGIN
     UPDATE plan_maestro
-    SET status = 'En Progreso',
-        updated_at = NOW()
+    SET status = 'En Progreso'
     WHERE
         status = 'Pendiente'
-        AND fecha_fin IS NOT NULL
-        AND CURRENT_DATE > fecha_fin;
+        AND fecha_fin < CURRENT_DATE;
+
+    GET DIAGNOSTICS filas_actualizadas = ROW_COUNT;
+    RETURN filas_actualizadas;
 END;
 $$ LANGUAGE plpgsql;
 
 
-SELECT cron.schedule(
-    'actualizar-plan-maestro',
-    '0 0 * * *', -- cada hora (puedes cambiarlo)
-    $$SELECT actualizar_plan_maestro_por_fecha();$$
-);
-
-
 CREATE OR REPLACE FUNCTION procesar_descripciones_cortas()
 RETURNS INTEGER
 LANGUAGE plpgsql
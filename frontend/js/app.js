@@ -7,6 +7,12 @@ const App = {
         App.setupNavigation();
         App.loadUserProfile();
 
+        // Enlaces de descarga con ticket vigente (ver API.fileUrl)
+        API.watchFileLinks();
+
+        // Cambios de otros usuarios llegan por push (SSE) en lugar de re-consultar
+        DataStore.connectEvents();
+
         // Initial View
         App.navigate('dashboard');
     },
@@ -20,7 +26,9 @@ const App = {
             });
         });
 
-        document.getElementById('btnLogout').addEventListener('click', () => {
+        document.getElementById('btnLogout').addEventListener('click', async () => {
+            DataStore.disconnectEvents();
+            await API.post('/auth/logout');
             localStorage.clear();
             window.location.href = 'index.html';
         });
@@ -94,6 +102,195 @@ const API = {
             return null;
         }
     },
+    /**
+     * GET condicional: envía If-None-Match con el ETag previo.
+     * Devuelve { status, etag, data }; con status 304 data es null (usar copia local).
+     */
+    getConditional: async (endpoint, etag = null) => {
+        const token = localStorage.getItem('token');
+        const headers = {};
+        if (token) headers['Authorization'] = `Bearer ${token}`;
+        if (etag) headers['If-None-Match'] = etag;
+
+        try {
+            const res = await fetch(`${API.BASE}${endpoint}`, { method: 'GET', headers, cache: 'no-store' });
+
+            if (res.status === 401) {
+                localStorage.clear();
+                window.location.href = 'index.html';
+                return null;
+            }
+            if (res.status === 304) return { status: 304, etag, data: null };
+            return { status: res.status, etag: res.headers.get('ETag'), data: await res.json() };
+        } catch (e) {
+            console.error(e);
+            return null;
+        }
+    },
+    /**
+     * Ticket de corta duración para poner en una URL (enlaces, EventSource), que
+     * no pueden enviar el header Authorization. El token de sesión nunca va en la
+     * URL: quedaría en logs de acceso, proxies e historial.
+     * @param {string} scope - 'descargas' | 'eventos'
+     */
+    ticket: async (scope) => {
+        const res = await API.post('/auth/ticket', { scope });
+        return res && res.ticket ? res.ticket : null;
+    },
+    _fileTickets: new Map(),   // ruta -> { ticket, expires } (ms)
+    _pendingRutas: new Set(),
+    _ticketBatch: null,
+    TICKET_MARGIN_MS: 60 * 60 * 1000, // renovar si le queda menos de 1 h
+    _fileTicket: (ruta) => {
+        const t = API._fileTickets.get(ruta);
+        return t && t.expires - Date.now() > API.TICKET_MARGIN_MS ? t.ticket : null;
+    },
+    /**
+     * Pide en lote (un POST por tick) los tickets de descarga que falten. Son por
+     * archivo y el backend redondea su vencimiento: el mismo archivo conserva la
+     * misma URL, y la cache del navegador, durante horas.
+     * @param {string[]} rutas - ruta_archivo de cada archivo
+     */
+    fileTickets: (rutas) => {
+        rutas.filter(r => !API._fileTicket(r)).forEach(r => API._pendingRutas.add(r));
+        if (!API._pendingRutas.size) return Promise.resolve();
+        if (!API._ticketBatch) {
+            API._ticketBatch = new Promise(resolve => setTimeout(resolve, 0)).then(async () => {
+                const pending = [...API._pendingRutas];
+                API._pendingRutas.clear();
+                API._ticketBatch = null;
+                for (let i = 0; i < pending.length; i += 500) {
+                    const res = await API.post('/auth/ticket', { scope: 'descargas', rutas: pending.slice(i, i + 500) });
+                    if (!res || !res.tickets) continue;
+                    const expires = Date.now() + res.expires_in * 1000;
+                    Object.entries(res.tickets).forEach(([ruta, ticket]) => API._fileTickets.set(ruta, { ticket, expires }));
+                }
+            });
+        }
+        return API._ticketBatch;
+    },
+    _uploadRuta: (url) => {
+        const prefix = `${API.BASE}/uploads/`;
+        if (!url.startsWith(prefix)) return null;
+        return url.slice(prefix.length).split('?')[0].split('/').map(decodeURIComponent).join('/');
+    },
+    /**
+     * Devuelve `url` (de API.fileUrl) con un ticket vigente, pidiéndolo si hace
+     * falta. Para iframes y aperturas que no pasan por un clic en un enlace.
+     */
+    authorizeFileUrl: async (url) => {
+        const ruta = API._uploadRuta(url);
+        if (!ruta) return url;
+        await API.fileTickets([ruta]);
+        const ticket = API._fileTicket(ruta);
+        if (!ticket) return url;
+        const u = new URL(url);
+        u.searchParams.set('ticket', ticket);
+        return u.toString();
+    },
+    /**
+     * Al hacer clic en un enlace de descarga ya dibujado le pone su ticket; si
+     * todavía no llegó, lo espera y abre el enlace.
+     */
+    watchFileLinks: () => {
+        document.addEventListener('click', (ev) => {
+            const a = ev.target.closest && ev.target.closest(`a[href^="${API.BASE}/uploads/"]`);
+            if (!a) return;
+            const ticket = API._fileTicket(API._uploadRuta(a.href));
+            if (ticket) {
+                const url = new URL(a.href);
+                url.searchParams.set('ticket', ticket);
+                a.href = url.toString();
+                return;
+            }
+            ev.preventDefault();
+            API.authorizeFileUrl(a.href).then(url => {
+                a.href = url;
+                window.open(url, a.target || '_self');
+            });
+        }, true);
+    },
+    /**
+     * URL de descarga/vista de un archivo subido, autenticada con ?ticket= (por
+     * archivo). Si el ticket aún no está, se pide en segundo plano y se agrega
+     * al hacer clic (watchFileLinks) o al previsualizar (authorizeFileUrl).
+     * @param {string} ruta - ruta_archivo del documento
+     * @param {string} [nombre] - nombre sugerido al guardar
+     */
+    fileUrl: (ruta, nombre = null) => {
+        const params = new URLSearchParams();
+        const ticket = API._fileTicket(ruta);
+        if (ticket) params.set('ticket', ticket);
+        else API.fileTickets([ruta]);
+        if (nombre) params.set('nombre', nombre);
+        const path = ruta.split('/').map(encodeURIComponent).join('/');
+        const query = params.toString();
+        return `${API.BASE}/uploads/${path}${query ? `?${query}` : ''}`;
+    },
+    UPLOAD_CHUNK: 8 * 1024 * 1024, // Igual al chunk_size sugerido por el backend
+    /**
+     * Subida por partes reanudable (/uploads/sesiones). La sesión se recuerda en
+     * localStorage por archivo (nombre + tamaño + fecha): si la subida se corta,
+     * volver a llamar con el mismo archivo continúa desde el último byte recibido.
+     * @param {File} file
+     * @param {Object} meta - { destino: 'documento', plan_id } o { destino: 'repositorio', titulo, ... }
+     * @param {Function} [onProgress] - (bytesEnviados, total)
+     */
+    uploadChunked: async (file, meta, onProgress = null) => {
+        const key = `upload:${file.name}:${file.size}:${file.lastModified}`;
+        const token = localStorage.getItem('token');
+
+        let session = null;
+        const saved = localStorage.getItem(key);
+        if (saved) {
+            const status = await API.get(`/uploads/sesiones/${saved}`);
+            if (status && status.offset !== undefined) session = { id: saved, offset: status.offset };
+        }
+        if (!session) {
+            session = await API.post('/uploads/sesiones', {
+                nombre_archivo: file.name, tamano: file.size, tipo_mime: file.type
+            });
+            if (!session || !session.id) throw new Error(session?.error || 'No se pudo iniciar la subida');
+            localStorage.setItem(key, session.id);
+        }
+
+        let offset = session.offset;
+        let retries = 0;
+        while (offset < file.size) {
+            const end = Math.min(offset + API.UPLOAD_CHUNK, file.size);
+            try {
+                const res = await fetch(`${API.BASE}/uploads/sesiones/${session.id}`, {
+                    method: 'PUT',
+                    headers: {
+                        'Authorization': `Bearer ${token}`,
+                        'Content-Type': 'application/octet-stream',
+                        'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`
+                    },
+                    body: file.slice(offset, end)
+                });
+                const json = await res.json();
+                if (res.status === 404) {
+                    localStorage.removeItem(key);
+                    throw Object.assign(new Error(json.error), { fatal: true });
+                }
+                if (!res.ok && json.offset === undefined) throw new Error(json.error || `Error ${res.status}`);
+                // 200: parte aceptada; 409 con offset: continuar desde donde quedó el servidor
+                offset = json.offset;
+                retries = 0;
+                if (onProgress) onProgress(offset, file.size);
+            } catch (e) {
+                if (e.fatal || ++retries > 5) throw e;
+                await new Promise(r => setTimeout(r, 1000 * 2 ** retries));
+                const status = await API.get(`/uploads/sesiones/${session.id}`);
+                if (status && status.offset !== undefined) offset = status.offset;
+            }
+        }
+
+        const result = await API.post(`/uploads/sesiones/${session.id}/completar`, meta);
+        if (!result || result.error) throw new Error(result?.error || 'Error al completar la subida');
+        localStorage.removeItem(key);
+        return result;
+    },
     get: (url) => API.request(url, 'GET'),
     post: (url, body) => API.request(url, 'POST', body),
     put: (url, body) => API.request(url, 'PUT', body),
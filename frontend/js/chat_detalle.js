@@ -2,7 +2,9 @@
 const ChatDetalle = {
     // Configuración
     config: {
-        MAX_DOCS: 2 // Activarse solo si hay 1 o 2 docs
+        MAX_DOCS: 2, // Activarse solo si hay 1 o 2 docs
+        MAX_CHARS: 25000, // Límite de contenido por documento (evita errores 429/Token Limit)
+        PASSAGE_CHARS: 1500 // Tamaño aproximado de un fragmento del índice de recuperación
     },
 
     /**
@@ -14,6 +16,77 @@ const ChatDetalle = {
         return docs && docs.length > 0 && docs.length <= ChatDetalle.config.MAX_DOCS;
     },
 
+    /**
+     * Descarga metadatos + contenido de archivo de los documentos.
+     * Pide NDJSON al backend: cada documento llega apenas su texto está listo y
+     * el contenido se acumula solo hasta MAX_CHARS (el resto se descarta al vuelo).
+     * Si el backend responde JSON clásico, se usa tal cual.
+     * @param {Array} docIds - IDs de repositorio
+     * @param {Function} [onDoc] - Callback opcional por documento completo
+     * @returns {Promise<Array>} - Documentos con 'file_content' (y 'truncated')
+     */
+    fetchFullDocs: async (docIds, onDoc = null) => {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`${API.BASE}/repositorio/detalle-completo`, {
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${token}`,
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson, application/json;q=0.9'
+            },
+            body: JSON.stringify({ ids: docIds })
+        });
+
+        if (!response.ok) {
+            throw new Error("Error obteniendo detalles completos de los documentos");
+        }
+
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.includes('application/x-ndjson') || !response.body) {
+            const docs = await response.json();
+            docs.forEach(d => onDoc && onDoc(d));
+            return docs;
+        }
+
+        const MAX_CHARS = ChatDetalle.config.MAX_CHARS;
+        const docs = [];
+        const pending = {};
+        const handle = (msg) => {
+            if (msg.type === 'doc') {
+                pending[msg.doc.id] = { ...msg.doc, file_content: '', truncated: msg.content_length > MAX_CHARS };
+            } else if (msg.type === 'content') {
+                const d = pending[msg.id];
+                if (d && d.file_content.length < MAX_CHARS) {
+                    d.file_content += msg.data.substring(0, MAX_CHARS - d.file_content.length);
+                }
+            } else if (msg.type === 'end') {
+                const d = pending[msg.id];
+                delete pending[msg.id];
+                if (d) {
+                    docs.push(d);
+                    if (onDoc) onDoc(d);
+                }
+            }
+        };
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let nl;
+            while ((nl = buffer.indexOf('\n')) >= 0) {
+                const line = buffer.substring(0, nl).trim();
+                buffer = buffer.substring(nl + 1);
+                if (line) handle(JSON.parse(line));
+            }
+        }
+        if (buffer.trim()) handle(JSON.parse(buffer));
+        return docs;
+    },
+
     /**
      * Obtiene el análisis detallado desde el backend y llama a la IA
      * @param {Array} docs - Los documentos filtrados (1 o 2)
@@ -23,35 +96,34 @@ const ChatDetalle = {
      */
     process: async (docs, userMessage, aiCaller) => {
         try {
-            // 1. Obtener contenido COMPLETO desde el backend
+            // 1. Obtener contenido COMPLETO desde el backend (streaming)
             // Extraer solo IDs para la petición
             const docIds = docs.map(d => d.id);
-            const token = localStorage.getItem('token');
-
-            // Notificar UI (opcional, si se quiere feedback específico)
-            // console.log("Modo Detalle Activado para docs:", docIds);
-
-            const response = await fetch(`${API.BASE}/repositorio/detalle-completo`, {
-                method: 'POST',
-                headers: {
-                    'Authorization': `Bearer ${token}`,
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ ids: docIds })
-            });
-
-            if (!response.ok) {
-                throw new Error("Error obteniendo detalles completos de los documentos");
-            }
-
-            const fullDocs = await response.json(); // Array con metadatos + 'file_content'
+            const fullDocs = await ChatDetalle.fetchFullDocs(docIds); // Array con metadatos + 'file_content'
+
+            // 1b. Documentos que exceden MAX_CHARS: en vez de cortar al inicio, enviar
+            // los fragmentos más relevantes a la pregunta (en orden de aparición)
+            const MAX_CHARS = ChatDetalle.config.MAX_CHARS;
+            await Promise.all(fullDocs.filter(d => d.truncated || (d.file_content || '').length > MAX_CHARS).map(async d => {
+                try {
+                    const k = Math.ceil(MAX_CHARS / ChatDetalle.config.PASSAGE_CHARS);
+                    const passages = await ChatModule.retrievePassages(userMessage, [d], k);
+                    if (passages.length) {
+                        d.passages = passages.sort((a, b) => a.orden - b.orden);
+                    }
+                } catch (e) {
+                    console.warn(`Sin fragmentos para doc ${d.id}, se trunca:`, e);
+                }
+            }));
 
             // 2. Construir un System Prompt Especializado
             const contextText = fullDocs.map(d => {
                 // Limitar longitud para evitar errores 429/Token Limit
-                const MAX_CHARS = 25000;
                 let rawContent = d.file_content || '(No se pudo extraer texto del archivo físico, básate en los metadatos anteriores)';
-                if (rawContent.length > MAX_CHARS) {
+                if (d.passages) {
+                    rawContent = "[DOCUMENTO EXTENSO: SE INCLUYEN SOLO LOS FRAGMENTOS MÁS RELEVANTES A LA PREGUNTA]\n\n" +
+                        d.passages.map(p => `[Fragmento ${p.orden}]\n${p.contenido}`).join('\n\n');
+                } else if (d.truncated || rawContent.length > MAX_CHARS) {
                     rawContent = rawContent.substring(0, MAX_CHARS) + "\n\n[... CONTENIDO TRUNCADO POR EXCESO DE LONGITUD ...]";
                 }
 
@@ -10,6 +10,7 @@
  *   - Mutación:    await DataStore.refreshPlan()
  *   - Suscripción: DataStore.on('plan:updated', (data) => { ... })
  *   - Desuscribir: DataStore.off('plan:updated', handler)
+ *   - Push:        DataStore.connectEvents()  (cambios de otros usuarios vía SSE)
  */
 const DataStore = {
 
@@ -22,6 +23,9 @@ const DataStore = {
 
     _listeners: {},
 
+    // ETag de la última respuesta por recurso (GET condicional)
+    _etags: {},
+
     // ─── Getters (read-only access) ──────────────────────────────
     get plan() { return this._state.plan; },
     get hitos() { return this._state.hitos; },
@@ -44,23 +48,103 @@ const DataStore = {
         });
     },
 
+    /**
+     * GET condicional de un recurso. Si el servidor responde 304 devuelve null
+     * (el estado local sigue vigente); si no, guarda el nuevo ETag y devuelve los datos.
+     */
+    _fetchIfChanged: async (resource, url) => {
+        const res = await API.getConditional(url, DataStore._etags[resource]);
+        if (!res || res.status === 304 || res.status !== 200) return null;
+        DataStore._etags[resource] = res.etag;
+        return res.data;
+    },
+
     // ─── Data Refresh Methods ────────────────────────────────────
 
     /**
-     * Refresca datos del Plan Maestro desde la API.
+     * Sincroniza Plan + Hitos con /sync.
+     * La primera llamada trae la foto completa; las siguientes solo las filas
+     * modificadas/eliminadas desde el último token, que se aplican en sitio sobre
+     * _state (las referencias que tengan los módulos siguen siendo válidas).
+     * Emite 'plan:updated' / 'hitos:updated' solo si hubo cambios.
+     * Llamadas concurrentes comparten la misma petición.
+     */
+    _sync: () => {
+        if (DataStore._syncInFlight) return DataStore._syncInFlight;
+        DataStore._syncInFlight = (async () => {
+            try {
+                let url = '/sync?tables=plan,hitos';
+                if (DataStore._syncToken) url += '&since=' + encodeURIComponent(DataStore._syncToken);
+                const res = await DataStore._fetchIfChanged('sync', url);
+                if (!res) return false; // 304: sin cambios
+
+                DataStore._syncToken = res.token;
+                const planChanged = DataStore._applyDelta(DataStore._state.plan, res.changes.plan, res.full, DataStore._sorters.plan);
+                const hitosChanged = DataStore._applyDelta(DataStore._state.hitos, res.changes.hitos, res.full, DataStore._sorters.hitos);
+
+                if (planChanged) {
+                    // Backward compat: mantener window.appData.plan sincronizado
+                    window.appData = window.appData || {};
+                    window.appData.plan = DataStore._state.plan;
+                    DataStore._emit('plan:updated', DataStore._state.plan);
+                }
+                if (hitosChanged) DataStore._emit('hitos:updated', DataStore._state.hitos);
+                return true;
+            } finally {
+                DataStore._syncInFlight = null;
+            }
+        })();
+        return DataStore._syncInFlight;
+    },
+
+    _syncToken: null,
+    _syncInFlight: null,
+
+    // Mismo orden que los listados del backend (NULLs al final)
+    _sorters: {
+        plan: (a, b) => a.id - b.id,
+        hitos: (a, b) => {
+            if (a.fecha_estimada === b.fecha_estimada) return a.id - b.id;
+            if (!a.fecha_estimada) return 1;
+            if (!b.fecha_estimada) return -1;
+            return a.fecha_estimada < b.fecha_estimada ? -1 : 1;
+        }
+    },
+
+    /**
+     * Aplica un delta { upserts, deletes } sobre el array `target` (en sitio).
+     * Con full=true el contenido se reemplaza. Devuelve true si hubo cambios.
+     */
+    _applyDelta: (target, delta, full, sortFn) => {
+        if (!delta) return false;
+        if (full) {
+            target.splice(0, target.length, ...delta.upserts);
+            return true;
+        }
+        if (!delta.upserts.length && !delta.deletes.length) return false;
+
+        const deleted = new Set(delta.deletes);
+        for (let i = target.length - 1; i >= 0; i--) {
+            if (deleted.has(target[i].id)) target.splice(i, 1);
+        }
+        const byId = new Map(target.map(r => [r.id, r]));
+        delta.upserts.forEach(row => {
+            const existing = byId.get(row.id);
+            if (existing) Object.assign(existing, row);
+            else target.push(row);
+        });
+        target.sort(sortFn);
+        return true;
+    },
+
+    /**
+     * Refresca datos del Plan Maestro desde la API (delta vía /sync).
      * Notifica a todos los suscriptores de 'plan:updated'.
      */
     refreshPlan: async () => {
         try {
-            const data = await API.get('/plan-maestro?t=' + Date.now());
-            if (data) {
-                DataStore._state.plan = data;
-                // Backward compat: mantener window.appData.plan sincronizado
-                window.appData = window.appData || {};
-                window.appData.plan = data;
-                DataStore._emit('plan:updated', data);
-            }
-            return data;
+            await DataStore._sync();
+            return DataStore._state.plan;
         } catch (e) {
             console.error('[DataStore] Error refreshing plan:', e);
             return null;
@@ -68,17 +152,13 @@ const DataStore = {
     },
 
     /**
-     * Refresca Hitos desde la API.
+     * Refresca Hitos desde la API (delta vía /sync).
      * Notifica a todos los suscriptores de 'hitos:updated'.
      */
     refreshHitos: async () => {
         try {
-            const data = await API.get('/hitos?t=' + Date.now());
-            if (data) {
-                DataStore._state.hitos = data;
-                DataStore._emit('hitos:updated', data);
-            }
-            return data;
+            await DataStore._sync();
+            return DataStore._state.hitos;
         } catch (e) {
             console.error('[DataStore] Error refreshing hitos:', e);
             return [];
@@ -91,11 +171,10 @@ const DataStore = {
      */
     refreshRepo: async () => {
         try {
-            const data = await API.get('/repositorio');
-            if (data) {
-                DataStore._state.repositorio = data;
-                DataStore._emit('repo:updated', data);
-            }
+            const data = await DataStore._fetchIfChanged('repositorio', '/repositorio');
+            if (!data) return DataStore._state.repositorio; // 304: sin cambios
+            DataStore._state.repositorio = data;
+            DataStore._emit('repo:updated', data);
             return data;
         } catch (e) {
             console.error('[DataStore] Error refreshing repo:', e);
@@ -115,6 +194,76 @@ const DataStore = {
         return { plan, hitos };
     },
 
+    // ─── Push de cambios (SSE) ───────────────────────────────────
+
+    _events: null,
+    _eventsRetry: null,
+    _eventsBackoff: 0,
+    _syncTimer: null,
+
+    /**
+     * Se conecta a /eventos. El backend avisa qué filas cambiaron (de cualquier
+     * usuario) y DataStore trae solo el delta vía /sync, emitiendo los eventos
+     * habituales ('plan:updated', 'hitos:updated', 'repo:updated').
+     * Cada lote crudo también se emite como 'changes'.
+     * Se autentica con un ticket de corta duración (nunca el token de sesión en la
+     * URL). Si el servidor rechaza la conexión (503: tope de clientes SSE por
+     * worker; 401: el ticket venció y el navegador reintentó con el mismo)
+     * EventSource no reintenta solo; se reintenta con backoff y un ticket nuevo, y
+     * al reconectar se hace un /sync por lo que se haya perdido.
+     */
+    connectEvents: async () => {
+        if (DataStore._events || !window.EventSource) return;
+        if (!localStorage.getItem('token')) return;
+        DataStore._events = 'connecting';
+        const ticket = await API.ticket('eventos');
+        if (DataStore._events !== 'connecting') return;  // disconnectEvents() mientras tanto
+        if (!ticket) {
+            DataStore._events = null;
+            return;
+        }
+
+        const es = new EventSource(`${API.BASE}/eventos?ticket=${encodeURIComponent(ticket)}`);
+        es.addEventListener('cambios', (ev) => {
+            let events;
+            try { events = JSON.parse(ev.data); } catch (e) { return; }
+            DataStore._emit('changes', events);
+
+            const tablas = new Set(events.map(e => e.tabla));
+            const all = tablas.has('*');
+            if (all || tablas.has('plan_maestro') || tablas.has('hitos')) DataStore._scheduleSync();
+            if ((all || tablas.has('repositorio_documentos')) && DataStore._state.repositorio.length) {
+                DataStore.refreshRepo();
+            }
+        });
+        es.onopen = () => {
+            if (DataStore._eventsBackoff) DataStore._scheduleSync();
+            DataStore._eventsBackoff = 0;
+        };
+        es.onerror = () => {
+            if (es.readyState !== EventSource.CLOSED) return;  // reintenta el navegador
+            DataStore._events = null;
+            DataStore._eventsBackoff = Math.min((DataStore._eventsBackoff || 15) * 2, 300);
+            DataStore._eventsRetry = setTimeout(DataStore.connectEvents, DataStore._eventsBackoff * 1000);
+        };
+        DataStore._events = es;
+    },
+
+    disconnectEvents: () => {
+        clearTimeout(DataStore._eventsRetry);
+        DataStore._eventsBackoff = 0;
+        if (DataStore._events && DataStore._events.close) DataStore._events.close();
+        DataStore._events = null;
+    },
+
+    // Agrupa ráfagas de eventos (p. ej. una importación masiva) en un solo /sync
+    _scheduleSync: () => {
+        clearTimeout(DataStore._syncTimer);
+        DataStore._syncTimer = setTimeout(() => {
+            DataStore._sync().catch(e => console.error('[DataStore] Error syncing:', e));
+        }, 300);
+    },
+
     /**
      * Busca un item del plan por ID (lectura desde la fuente central).
      */
@@ -12,6 +12,8 @@ const ChatModule = {
         //MODEL_NAME: "GLM-4.7",
         MODEL_NAME1: "GLM-4.7-FlashX",
         MODEL_NAME2: "GLM-4.7",
+        PASSAGES_K: 12,       // Fragmentos enviados como contexto en modo estándar
+        MAX_IDS_IN_URL: 300,
     },
 
     // State
@@ -199,17 +201,27 @@ const ChatModule = {
             }
         }
 
-        // 2. Standard Mode (Summary Context)
-        const { API_KEY, API_URL, MODEL_NAME } = ChatModule.config;
+        // 2. Standard Mode: solo los fragmentos más relevantes a la pregunta
+        let docsSummary = '';
+        try {
+            const passages = await ChatModule.retrievePassages(prompt, docs, ChatModule.config.PASSAGES_K);
+            docsSummary = passages.map(p =>
+                `[ID:${p.documento_id}] - "${p.titulo}" (fragmento ${p.orden}): ${p.contenido}`
+            ).join('\n\n');
+        } catch (e) {
+            console.warn("Recuperación de fragmentos no disponible, usando resúmenes:", e);
+        }
 
-        // Build summary context from documents
-        const docsSummary = docs.slice(0, 100).map(d => {
-            const content = d.resumen_largo || d.descripcion || '';
-            return `[ID:${d.id}] - "${d.titulo}" (${d.tipo_documento || 'Doc'}): ${content.substring(0, 500)}`;
-        }).join('\n');
+        // Sin índice o sin coincidencias: resúmenes de los primeros documentos
+        if (!docsSummary) {
+            docsSummary = docs.slice(0, 100).map(d => {
+                const content = d.resumen_largo || d.descripcion || '';
+                return `[ID:${d.id}] - "${d.titulo}" (${d.tipo_documento || 'Doc'}): ${content.substring(0, 500)}`;
+            }).join('\n');
+        }
 
         const systemPrompt = `Eres un asistente experto en documentos estratégicos de gestión de proyectos.
-Tienes acceso a la siguiente biblioteca de ${docs.length} documentos:
+Tienes acceso a una biblioteca de ${docs.length} documentos. Estos son los fragmentos más relevantes para la pregunta:
 
 ${docsSummary}
 
@@ -234,6 +246,24 @@ Al final de tu respuesta, sugieres 3 preguntas de seguimiento que esten estrecha
         return await ChatModule.callAI_Raw(prompt, systemPrompt);
     },
 
+    /**
+     * Top-k fragmentos (BM25) de /repositorio/retrieve restringidos a `docs`.
+     * Con muchos documentos no se envían los ids en la URL: se piden más
+     * fragmentos y se filtran acá.
+     */
+    retrievePassages: async (query, docs, k) => {
+        const allowed = new Set(docs.map(d => d.id));
+        const params = new URLSearchParams({ q: query });
+        if (allowed.size <= ChatModule.config.MAX_IDS_IN_URL) {
+            params.set('ids', [...allowed].join(','));
+            params.set('k', k);
+        } else {
+            params.set('k', Math.min(k * 3, 50));
+        }
+        const res = await API.get(`/repositorio/retrieve?${params}`);
+        return (res.passages || []).filter(p => allowed.has(p.documento_id)).slice(0, k);
+    },
+
     // Raw API Caller (Re-usable)
     callAI_Raw: async (userPrompt, systemPrompt) => {
         const { API_KEY, API_URL, MODEL_NAME } = ChatModule.config;
@@ -369,12 +399,12 @@ Al final de tu respuesta, sugieres 3 preguntas de seguimiento que esten estrecha
         const doc = docs.find(d => d.id == id);
         if (doc) {
             if (doc.ruta_archivo) {
-                const url = `${API.BASE}/uploads/${doc.ruta_archivo}`;
+                const url = API.fileUrl(doc.ruta_archivo, doc.nombre_archivo);
                 // Use Utils from global scope
                 if (window.Utils && window.Utils.previewFile) {
                     Utils.previewFile(url, doc.titulo);
                 } else {
-                    window.open(url, '_blank');
+                    API.authorizeFileUrl(url).then(u => window.open(u, '_blank'));
                 }
             } else if (doc.enlace_externo) {
                 window.open(doc.enlace_externo, '_blank');
@@ -79,7 +79,7 @@ const DocumentsModule = {
             else if (/\.(xls|xlsx|csv)$/i.test(d.nombre_archivo)) { iconClass = 'fa-file-excel'; iconColor = 'text-green-500'; }
             else if (/\.(doc|docx)$/i.test(d.nombre_archivo)) { iconClass = 'fa-file-word'; iconColor = 'text-blue-500'; }
 
-            const url = `${API.BASE}/uploads/${d.ruta_archivo}`;
+            const url = API.fileUrl(d.ruta_archivo, d.nombre_archivo);
 
             tr.innerHTML = `
                 <td>
@@ -170,6 +170,24 @@ const DocumentsModule = {
             return;
         }
 
+        // Archivos grandes: subida por partes, reanudable si se corta la conexión
+        if (file.size > API.UPLOAD_CHUNK) {
+            const btn = e.submitter;
+            const label = btn ? btn.innerHTML : '';
+            try {
+                await API.uploadChunked(file, { destino: 'documento', plan_id: planId }, (sent, total) => {
+                    if (btn) btn.textContent = `Subiendo... ${Math.floor(sent * 100 / total)}%`;
+                });
+                Utils.closeModal('docGlobalModal');
+                DocumentsModule.init(); // Reload
+            } catch (err) {
+                Utils.showToast('Error: ' + err.message + ' (puede reintentar: la subida continuará)', 'error');
+            } finally {
+                if (btn) btn.innerHTML = label;
+            }
+            return;
+        }
+
         const formData = new FormData();
         formData.append('file', file);
         formData.append('plan_id', planId);
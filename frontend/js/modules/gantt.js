@@ -9,7 +9,8 @@ const GanttModule = {
         filteredData: [],
         minDate: null,
         maxDate: null,
-        filters: { product: '', resp: '' }
+        filters: { product: '', resp: '' },
+        schedule: new Map() // id -> resultado de /plan-maestro/schedule
     },
 
     init: async () => {
@@ -23,6 +24,7 @@ const GanttModule = {
 
         GanttModule.state.data = plan || [];
         GanttModule.state.hitos = hitos || [];
+        await GanttModule.loadSchedule();
 
         // Subscribe to data changes (idempotent — unsubscribe first)
         DataStore.off('plan:updated', GanttModule._onPlanUpdated);
@@ -51,6 +53,14 @@ const GanttModule = {
         GanttModule.setupInteractions();
     },
 
+    // Ruta crítica y holguras calculadas en el backend (CPM sobre dependency_code)
+    loadSchedule: async () => {
+        const res = await API.get('/plan-maestro/schedule');
+        if (res && Array.isArray(res.items)) {
+            GanttModule.state.schedule = new Map(res.items.map(s => [s.id, s]));
+        }
+    },
+
     clearFilters: () => {
         const ids = ['ganttFilterProduct', 'ganttFilterResp', 'ganttFilterStatus', 'ganttSearch'];
         ids.forEach(id => {
@@ -250,6 +260,10 @@ const GanttModule = {
             if (end < now) barClass = 'bar-late';
         }
 
+        const sched = GanttModule.state.schedule.get(item.id);
+        if (sched && sched.critical) barClass += ' bar-critical';
+        const slackText = sched && sched.slack !== null ? `${sched.slack} sem` : '-';
+
         // --- Render Hitos Markers ---
         let hitosHtml = '';
         if (GanttModule.state.hitos) {
@@ -306,7 +320,7 @@ const GanttModule = {
                      <!-- Bar -->
                      <div class="gantt-bar-container ${barClass}" 
                           style="left: ${leftPct}%; width: ${Math.max(0.5, widthPct)}%; z-index: 2;"
-                          onmouseenter="GanttModule.showTooltip(event, '${item.task_name}', '${Utils.formatDate(item.fecha_inicio)}', '${Utils.formatDate(item.fecha_fin)}', '${item.status}', '${item.primary_responsible}')"
+                          onmouseenter="GanttModule.showTooltip(event, '${item.task_name}', '${Utils.formatDate(item.fecha_inicio)}', '${Utils.formatDate(item.fecha_fin)}', '${item.status}', '${item.primary_responsible}', '${slackText}')"
                           onmouseleave="GanttModule.hideTooltip()"
                           onclick="PlanModule.viewDetails(${item.id})"
                      >
@@ -469,7 +483,7 @@ const GanttModule = {
     },
 
     // --- TOOLTIP ---
-    showTooltip: (e, name, start, end, status, resp) => {
+    showTooltip: (e, name, start, end, status, resp, slack = '-') => {
         const tip = document.getElementById('ganttTooltip');
         tip.innerHTML = `
             <div class="font-bold mb-1" style="color:white; border-bottom:1px solid #334155; padding-bottom:4px;">${name}</div>
@@ -477,6 +491,7 @@ const GanttModule = {
             <div class="gantt-tooltip-row"><span class="gantt-tooltip-label">Fin:</span> ${end}</div>
             <div class="gantt-tooltip-row"><span class="gantt-tooltip-label">Estado:</span> ${status}</div>
             <div class="gantt-tooltip-row"><span class="gantt-tooltip-label">Resp:</span> ${resp}</div>
+            <div class="gantt-tooltip-row"><span class="gantt-tooltip-label">Holgura:</span> ${slack}</div>
         `;
         tip.style.display = 'block';
 
@@ -513,11 +528,12 @@ const GanttModule = {
     },
 
     // DataStore observer callback — auto-sync on data mutation
-    _onPlanUpdated: (freshData) => {
+    _onPlanUpdated: async (freshData) => {
         // Only re-render if Gantt view is currently visible
         const ganttSection = document.getElementById('view-gantt');
         if (ganttSection && ganttSection.style.display !== 'none') {
             GanttModule.state.data = freshData || [];
+            await GanttModule.loadSchedule();
             GanttModule.applyFilters();
         } else {
             // Just update data silently; next init() will use fresh data
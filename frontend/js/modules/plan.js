@@ -147,6 +147,10 @@ const PlanModule = {
             else if (item.status === 'Completado' || item.status === 'Listo' || item.status === 'Finalizado') badgeClass = 'badge badge-green';
             else if (item.status === 'Retrasado') badgeClass = 'badge badge-red';
             // If explicit Pendiente, it stays red. If explicit gray needed, we lack a status for it now.
+            // Vencida / Por vencer: derived by the backend from fecha_fin
+            let dueBadge = '';
+            if (item.estado_derivado === 'Vencida') dueBadge = `<div><span class="badge badge-red" style="font-size:0.65rem; padding:2px 8px; margin-top:4px;">Vencida</span></div>`;
+            else if (item.estado_derivado === 'Por vencer') dueBadge = `<div><span class="badge badge-yellow" style="font-size:0.65rem; padding:2px 8px; margin-top:4px;">Por vencer</span></div>`;
 
             // Format dates
             const start = item.fecha_inicio ? Utils.formatDate(item.fecha_inicio) : '-';
@@ -178,7 +182,7 @@ const PlanModule = {
                     ${role}
                     ${coResp}
                 </td>
-                <td><span class="${badgeClass}">${item.status || 'Pendiente'}</span></td>
+                <td><span class="${badgeClass}">${item.status || 'Pendiente'}</span>${dueBadge}</td>
                 <td>
                     <div class="text-xs font-medium text-slate-600">${start}</div>
                     <div class="text-xs text-slate-400">a ${end}</div>
@@ -334,7 +338,7 @@ const PlanModule = {
         if (!container) return;
         container.innerHTML = '<div class="text-center text-slate-400 text-xs">Cargando...</div>';
         try {
-            const obs = await API.get(`/plan-maestro/${id}/observaciones`);
+            const { observaciones: obs } = await PlanModule.loadDetails(id);
             if (obs && obs.length > 0) {
                 container.innerHTML = obs.map(o => `
                     <div class="mb-2 pb-2 border-b border-slate-100 last:border-0 last:mb-0 last:pb-0">
@@ -416,7 +420,7 @@ const PlanModule = {
         const listDiv = document.getElementById('modalHitosList');
         listDiv.innerHTML = '<div class="text-sm text-center">Cargando...</div>';
 
-        const hitos = await API.get(`/plan-maestro/${planId}/hitos`);
+        const { hitos } = await PlanModule.loadDetails(planId).catch(() => ({ hitos: null }));
         listDiv.innerHTML = '';
 
         if (!hitos || hitos.length === 0) {
@@ -512,6 +516,37 @@ const PlanModule = {
         }
     },
 
+    // --- DETALLE EN LOTE ---
+    // Hitos, documentos y observaciones por actividad vía /plan-maestro/details.
+    // Las actividades pedidas en el mismo tick comparten una sola request.
+    _detailQueue: new Map(),
+
+    loadDetails: (id) => {
+        const queued = PlanModule._detailQueue.get(id);
+        if (queued) return queued.promise;
+
+        const entry = {};
+        entry.promise = new Promise((resolve, reject) => {
+            entry.resolve = resolve;
+            entry.reject = reject;
+        });
+        PlanModule._detailQueue.set(id, entry);
+        if (PlanModule._detailQueue.size === 1) setTimeout(PlanModule._flushDetails, 0);
+        return entry.promise;
+    },
+
+    _flushDetails: async () => {
+        const batch = PlanModule._detailQueue;
+        PlanModule._detailQueue = new Map();
+        try {
+            const res = await API.get(`/plan-maestro/details?ids=${[...batch.keys()].join(',')}`);
+            if (!res || res.error) throw new Error(res ? res.error : 'Sin respuesta');
+            batch.forEach((entry, id) => entry.resolve(res[id] || { hitos: [], documentos: [], observaciones: [] }));
+        } catch (e) {
+            batch.forEach(entry => entry.reject(e));
+        }
+    },
+
     viewDetails: async (id) => {
         if (!DataStore.plan.length) return;
         const item = DataStore.findPlanItem(id);
@@ -616,7 +651,8 @@ const PlanModule = {
         // 2. OPEN MODAL IMMEDIATELY
         Utils.openModal('detailModal');
 
-        // 3. ASYNC LOAD OPTIMIZATION (Load all sections in parallel safe mode)
+        // 3. ASYNC LOAD OPTIMIZATION (one batched request feeds all sections)
+        const details = PlanModule.loadDetails(item.id);
 
         // --- A. HITOS ---
         const hitosContainer = document.getElementById('detailHitosList');
@@ -624,7 +660,7 @@ const PlanModule = {
             hitosContainer.innerHTML = '<div class="text-center p-4"><i class="fas fa-spinner fa-spin text-indigo-500"></i> <span class="text-slate-400 text-sm ml-2">Cargando hitos...</span></div>';
 
             // Non-blocking fetch
-            API.get(`/plan-maestro/${item.id}/hitos`).then(hitos => {
+            details.then(d => d.hitos).then(hitos => {
                 if (hitos && hitos.length > 0) {
                     hitosContainer.innerHTML = '<div class="grid grid-cols-1 md:grid-cols-2 gap-3">' + hitos.map(h => {
                         const status = h.status || h.estado || 'Pendiente';
@@ -667,7 +703,7 @@ const PlanModule = {
             docsContainer.style.cssText = "display:grid; gap:12px; padding:0 8px;";
             docsContainer.innerHTML = '<div class="text-center p-4"><i class="fas fa-spinner fa-spin text-amber-500"></i> <span class="text-slate-400 text-sm ml-2">Buscando evidencia...</span></div>';
 
-            API.get(`/plan-maestro/${id}/documentos`).then(docs => {
+            details.then(d => d.documentos).then(docs => {
                 if (docs && docs.length > 0) {
                     docsContainer.innerHTML = docs.map(d => {
                         const isPdf = d.nombre_archivo.toLowerCase().endsWith('.pdf');
@@ -680,7 +716,7 @@ const PlanModule = {
                         else if (/\.(xls|xlsx|csv)$/i.test(d.nombre_archivo)) colors = { bg: '#dcfce7', icon: '#16a34a', text: 'fa-file-excel' };
                         else if (/\.(doc|docx)$/i.test(d.nombre_archivo)) colors = { bg: '#dbeafe', icon: '#2563eb', text: 'fa-file-word' };
 
-                        const url = `${API.BASE}/uploads/${d.ruta_archivo}`;
+                        const url = API.fileUrl(d.ruta_archivo, d.nombre_archivo);
 
                         return `
                         <div style="background:white; padding:12px; border-radius:16px; border:1px solid #f1f5f9; box-shadow:0 4px 15px rgba(0,0,0,0.03); display:flex; justify-content:space-between; align-items:center; transition:transform 0.2s;" onmouseover="this.style.transform='translateY(-2px)'" onmouseout="this.style.transform='translateY(0)'">
@@ -745,7 +781,7 @@ const PlanModule = {
 
             obsContainer.innerHTML = formHtml + '<div id="obsItemsList" class="mt-4 space-y-3"><div class="text-center p-4"><i class="fas fa-spinner fa-spin text-blue-500"></i> <span class="text-slate-400 text-sm ml-2">Cargando bitácora...</span></div></div>';
 
-            API.get(`/plan-maestro/${id}/observaciones`).then(obs => {
+            details.then(d => d.observaciones).then(obs => {
                 const itemsList = document.getElementById('obsItemsList');
                 if (obs && obs.length > 0) {
                     itemsList.innerHTML = obs.map(o => `
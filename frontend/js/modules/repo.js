@@ -3,6 +3,8 @@ const RepoModule = {
     data: [],
     selectedIds: new Set(), // Nuevo: Selección manual
     lastFilteredData: [],   // Nuevo: Cache de filtro
+    searchHits: null,       // Map id -> {rank, fragmento} de /repositorio/buscar
+    _searchSeq: 0,
 
     init: async () => {
         Utils.renderBreadcrumbs(['Inicio', 'Biblioteca Estratégica']);
@@ -154,12 +156,16 @@ const RepoModule = {
             const fYear = document.getElementById('repoFilterYear')?.value || '';
             const fTag = document.getElementById('repoFilterTags')?.value.toLowerCase() || '';
 
-            const filtered = RepoModule.data.filter(item => {
-                const textMatch = !fSearch ||
+            // Con resultados del servidor (incluye contenido de archivos) se usan esos;
+            // mientras llegan, filtro local sobre metadatos.
+            const hits = fSearch ? RepoModule.searchHits : null;
+
+            let filtered = RepoModule.data.filter(item => {
+                const textMatch = !fSearch || (hits ? hits.has(item.id) :
                     (item.titulo || '').toLowerCase().includes(fSearch) ||
                     (item.descripcion || '').toLowerCase().includes(fSearch) ||
                     (item.etiquetas || '').toLowerCase().includes(fSearch) ||
-                    (item.puntos_clave || '').toLowerCase().includes(fSearch);
+                    (item.puntos_clave || '').toLowerCase().includes(fSearch));
 
                 const typeMatch = !fType || (item.tipo_documento || '').toLowerCase() === fType || (item.tipo_documento || '').toLowerCase().includes(fType);
                 const srcTypeMatch = !fSrcType || (item.tipo_fuente || '').toLowerCase() === fSrcType;
@@ -177,6 +183,12 @@ const RepoModule = {
                 return textMatch && typeMatch && srcTypeMatch && originMatch && yearMatch && tagsMatch;
             });
 
+            if (hits) {
+                filtered = filtered
+                    .map(item => ({ ...item, _fragmento: hits.get(item.id).fragmento }))
+                    .sort((a, b) => hits.get(b.id).rank - hits.get(a.id).rank);
+            }
+
             // Visual Chips
             const activeValObj = {
                 repoFilterType: document.getElementById('repoFilterType')?.value,
@@ -198,14 +210,43 @@ const RepoModule = {
             RepoModule.updateChatContext();
         };
 
+        let searchTimer = null;
+        const search = () => {
+            RepoModule.searchHits = null;
+            filter();
+            clearTimeout(searchTimer);
+            const q = document.getElementById('repoSearch')?.value.trim() || '';
+            if (!q) return;
+            searchTimer = setTimeout(async () => {
+                const seq = ++RepoModule._searchSeq;
+                try {
+                    const res = await API.get(`/repositorio/buscar?q=${encodeURIComponent(q)}&limit=100`);
+                    if (seq !== RepoModule._searchSeq) return; // llegó una búsqueda más nueva
+                    RepoModule.searchHits = new Map((res.items || []).map(r => [r.id, r]));
+                    filter();
+                } catch (e) {
+                    console.warn('Búsqueda en servidor no disponible, se mantiene filtro local', e);
+                }
+            }, 250);
+        };
+
         inputs.forEach(id => {
             const el = document.getElementById(id);
             if (el) {
-                el.addEventListener(el.tagName === 'SELECT' ? 'change' : 'input', filter);
+                el.addEventListener(el.tagName === 'SELECT' ? 'change' : 'input', id === 'repoSearch' ? search : filter);
             }
         });
     },
 
+    // Fragmento de ts_headline: se escapa todo y solo se restauran los <mark>
+    highlight: (text) => {
+        const div = document.createElement('div');
+        div.textContent = text || '';
+        return div.innerHTML
+            .replace(/&lt;mark&gt;/g, '<mark class="bg-yellow-100 text-slate-800 rounded px-0.5">')
+            .replace(/&lt;\/mark&gt;/g, '</mark>');
+    },
+
     // Nueva lógica de contexto para el chat
     updateChatContext: () => {
         let docsToSend;
@@ -378,7 +419,7 @@ const RepoModule = {
         // ACTIONS
         let mainAction = '';
         if (hasFile) {
-            const url = `${API.BASE}/uploads/${item.ruta_archivo}`;
+            const url = API.fileUrl(item.ruta_archivo, item.nombre_archivo);
             const isPreviewable = /\.(pdf|jpg|png)$/i.test(item.ruta_archivo);
             mainAction = `
                 <div class="flex gap-2 w-full mt-4 pt-3 border-t border-slate-50">
@@ -509,6 +550,10 @@ const RepoModule = {
                          <div class="text-xs text-slate-500 leading-relaxed line-clamp-3 group-hover:line-clamp-none transition-all duration-500" title="Click para expandir">
                             <span class="font-semibold text-slate-700">Resumen:</span> ${item.descripcion || 'Sin descripción disponible.'}
                         </div>
+                        ${item._fragmento ? `
+                        <div class="mt-2 text-xs text-slate-500 leading-relaxed italic border-l-2 border-yellow-200 pl-2">
+                            ${RepoModule.highlight(item._fragmento)}
+                        </div>` : ''}
                     </div>
 
                     <!-- Key Points (Insights) -->
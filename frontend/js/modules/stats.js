@@ -11,9 +11,9 @@ const StatsModule = {
         // Ensure data exists via centralized DataStore
         const plan = DataStore.plan.length > 0 ? DataStore.plan : await DataStore.refreshPlan() || [];
 
-        // Fetch milestones via DataStore
-        const hitosData = DataStore.hitos.length > 0 ? DataStore.hitos : await DataStore.refreshHitos() || [];
-        const hitosCount = hitosData.length;
+        // Conteos agregados en el backend (no hace falta bajar todos los hitos)
+        const summary = await API.get('/stats/summary');
+        const hitosCount = summary && summary.hitos ? summary.hitos.total : DataStore.hitos.length;
 
         StatsModule.renderKPIs(plan, hitosCount);
         StatsModule.renderProgressRing(plan);
@@ -24,7 +24,7 @@ const StatsModule = {
         StatsModule.renderComparison(plan);
         StatsModule.renderHeatmap(plan);
         StatsModule.renderUpcoming(plan);
-        StatsModule.renderRecentActions(plan);
+        StatsModule.renderRecentActions();
 
         // Trigger scroll animations
         if (window.Enhancements) {
@@ -428,96 +428,31 @@ const StatsModule = {
         `).join('');
     },
 
-    renderRecentActions: async (dataTasks) => {
+    renderRecentActions: async () => {
         const container = document.getElementById('statsRecent');
         if (!container) return;
 
         container.innerHTML = '<div class="p-6 text-center text-slate-400 text-sm italic">Cargando movimientos...</div>';
 
         try {
-            // Fetch all parallel data sources
-            const [hitosRes, obsRes, docsRes] = await Promise.all([
-                DataStore.hitos.length > 0 ? DataStore.hitos : API.get('/hitos').catch(() => []),
-                API.get('/observaciones').catch(() => []),
-                API.get('/documentos').catch(() => [])
-            ]);
-
-            // Normalize data for timeline
-            // Status: 0=Task, 1=Hito, 2=Doc, 3=Obs
-            let allItems = [];
-
-            // 1. Tasks
-            dataTasks.forEach(t => {
-                if (t.created_at) {
-                    allItems.push({
-                        type: 'task',
-                        date: new Date(t.created_at),
-                        title: t.task_name,
-                        subtitle: `Código: ${t.activity_code}`,
-                        user: t.created_by_name || 'Sistema', // Assuming we might have this or not
-                        icon: 'fa-tasks',
-                        color: 'indigo'
-                    });
-                }
-            });
-
-            // 2. Hitos
-            if (Array.isArray(hitosRes)) {
-                hitosRes.forEach(h => {
-                    const d = h.created_at || h.fecha_estimada; // Use created_at if available, else estim
-                    if (d) {
-                        allItems.push({
-                            type: 'hito',
-                            date: new Date(d),
-                            title: `Hito: ${h.nombre}`,
-                            subtitle: h.task_name || 'Sin actividad vinculada',
-                            user: 'Sistema',
-                            icon: 'fa-flag',
-                            color: 'amber'
-                        });
-                    }
-                });
-            }
-
-            // 3. Observations
-            if (Array.isArray(obsRes)) {
-                obsRes.forEach(o => {
-                    if (o.created_at) {
-                        allItems.push({
-                            type: 'obs',
-                            date: new Date(o.created_at),
-                            title: `Observación en ${o.activity_code || 'Actividad'}`,
-                            subtitle: o.texto ? (o.texto.substring(0, 50) + '...') : '',
-                            user: o.usuario_nombre || 'Usuario',
-                            icon: 'fa-comment-alt',
-                            color: 'blue'
-                        });
-                    }
-                });
-            }
-
-            // 4. Documents
-            if (Array.isArray(docsRes)) {
-                docsRes.forEach(d => {
-                    if (d.created_at) {
-                        allItems.push({
-                            type: 'doc',
-                            date: new Date(d.created_at),
-                            title: `Documento: ${d.nombre_archivo}`,
-                            subtitle: d.task_name || 'Sin actividad',
-                            user: d.uploader || 'Usuario',
-                            icon: 'fa-file-alt',
-                            color: 'emerald'
-                        });
-                    }
-                });
-            }
-
-            // Sort descending
-            allItems.sort((a, b) => b.date - a.date);
-
-            // Take top 8
-            const recent = allItems.slice(0, 8);
+            // Timeline ya mezclado y ordenado en el backend
+            const ACTION_STYLES = {
+                task: { icon: 'fa-tasks', color: 'indigo' },
+                hito: { icon: 'fa-flag', color: 'amber' },
+                obs: { icon: 'fa-comment-alt', color: 'blue' },
+                doc: { icon: 'fa-file-alt', color: 'emerald' }
+            };
+            const activity = await API.get('/stats/activity?limit=8');
+            const recent = (Array.isArray(activity) ? activity : [])
+                .filter(a => a.date)
+                .map(a => ({
+                    type: a.type,
+                    date: new Date(a.date),
+                    title: a.title,
+                    subtitle: a.type === 'obs' && a.subtitle ? a.subtitle + '...' : (a.subtitle || ''),
+                    user: a.user,
+                    ...ACTION_STYLES[a.type]
+                }));
 
             if (recent.length === 0) {
                 container.innerHTML = '<div class="p-6 text-center text-slate-400 text-sm">No hay movimientos recientes.</div>';
@@ -647,7 +647,9 @@ const Utils = {
             document.body.appendChild(modal);
         }
         document.getElementById('previewTitle').textContent = title;
-        document.getElementById('previewFrame').src = url;
+        const frame = document.getElementById('previewFrame');
+        // Archivos subidos: la URL lleva el ticket del archivo (ver API.fileUrl)
+        (typeof API !== 'undefined' ? API.authorizeFileUrl(url) : Promise.resolve(url)).then(src => { frame.src = src; });
         modal.style.display = 'flex';
     },
 